@@ -0,0 +1,46 @@
+"""add reservation starts_at/ends_at window
+
+Revision ID: 3f5d8a1c6b20
+Revises: 7a1c2d9e4f03
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "3f5d8a1c6b20"
+down_revision: Union[str, Sequence[str], None] = "7a1c2d9e4f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("reservations", sa.Column("starts_at", sa.DateTime(), nullable=True))
+    op.add_column("reservations", sa.Column("ends_at", sa.DateTime(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE reservations
+        SET starts_at = reservation_date + reservation_time,
+            ends_at = reservation_date + reservation_time
+                + duration_minutes * INTERVAL '1 minute'
+        """
+    )
+
+    op.alter_column("reservations", "starts_at", nullable=False)
+    op.alter_column("reservations", "ends_at", nullable=False)
+    op.create_index(
+        "ix_reservations_date_status_window",
+        "reservations",
+        ["reservation_date", "status", "starts_at", "ends_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reservations_date_status_window", table_name="reservations")
+    op.drop_column("reservations", "ends_at")
+    op.drop_column("reservations", "starts_at")
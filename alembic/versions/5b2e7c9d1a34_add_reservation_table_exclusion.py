@@ -0,0 +1,58 @@
+"""add per-table booking windows and overlap exclusion constraint
+
+Revision ID: 5b2e7c9d1a34
+Revises: 3f5d8a1c6b20
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "5b2e7c9d1a34"
+down_revision: Union[str, Sequence[str], None] = "3f5d8a1c6b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("reservation_tables", sa.Column("starts_at", sa.DateTime(), nullable=True))
+    op.add_column("reservation_tables", sa.Column("ends_at", sa.DateTime(), nullable=True))
+    op.add_column(
+        "reservation_tables",
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+    op.execute(
+        """
+        UPDATE reservation_tables AS rt
+        SET starts_at = r.starts_at,
+            ends_at = r.ends_at,
+            is_active = r.status IN ('confirmed', 'seated')
+        FROM reservations AS r
+        WHERE r.id = rt.reservation_id
+        """
+    )
+
+    # btree_gist lets the GiST index combine "table_id =" with the range overlap.
+    # Creating the constraint fails if existing data already double-books a table.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_exclude_constraint(
+        "ex_reservation_tables_no_overlap",
+        "reservation_tables",
+        ("table_id", "="),
+        (sa.text("tsrange(starts_at, ends_at)"), "&&"),
+        using="gist",
+        where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "ex_reservation_tables_no_overlap", "reservation_tables", type_="exclude"
+    )
+    op.drop_column("reservation_tables", "is_active")
+    op.drop_column("reservation_tables", "ends_at")
+    op.drop_column("reservation_tables", "starts_at")
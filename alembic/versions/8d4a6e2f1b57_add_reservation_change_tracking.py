@@ -0,0 +1,53 @@
+"""add reservation updated_at/change_seq and change counters
+
+Revision ID: 8d4a6e2f1b57
+Revises: 5b2e7c9d1a34
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "8d4a6e2f1b57"
+down_revision: Union[str, Sequence[str], None] = "5b2e7c9d1a34"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_counters",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    op.add_column(
+        "reservations", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column("reservations", sa.Column("change_seq", sa.Integer(), nullable=True))
+
+    # Existing rows count as changed once, in id order
+    op.execute("UPDATE reservations SET updated_at = now(), change_seq = id")
+    op.execute(
+        """
+        INSERT INTO change_counters (name, value)
+        SELECT 'reservations', COALESCE(MAX(id), 0) FROM reservations
+        """
+    )
+
+    op.alter_column("reservations", "updated_at", nullable=False)
+    op.alter_column("reservations", "change_seq", nullable=False)
+    op.create_index(
+        op.f("ix_reservations_change_seq"), "reservations", ["change_seq"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_reservations_change_seq"), table_name="reservations")
+    op.drop_column("reservations", "change_seq")
+    op.drop_column("reservations", "updated_at")
+    op.drop_table("change_counters")
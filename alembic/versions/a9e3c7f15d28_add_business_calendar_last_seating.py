@@ -0,0 +1,31 @@
+"""add last seating time to business calendar
+
+Revision ID: a9e3c7f15d28
+Revises: f4c8b2d6e071
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a9e3c7f15d28"
+down_revision: Union[str, Sequence[str], None] = "f4c8b2d6e071"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "business_calendar",
+        sa.Column("last_seating_at", sa.DateTime(), nullable=True),
+    )
+    # The calendar is derived data: drop it so every row is regenerated with
+    # last_seating_at (on first read, or by `python -m rezzy.cli refresh-calendar`)
+    op.execute("DELETE FROM business_calendar")
+
+
+def downgrade() -> None:
+    op.drop_column("business_calendar", "last_seating_at")
@@ -0,0 +1,31 @@
+"""seed hours change counter
+
+Revision ID: b5d1f8a2c604
+Revises: a9e3c7f15d28
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b5d1f8a2c604"
+down_revision: Union[str, Sequence[str], None] = "a9e3c7f15d28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Created up front so concurrent first hours writes both find a row to bump
+    op.execute(
+        """
+        INSERT INTO change_counters (name, value)
+        SELECT 'hours', 0
+        WHERE NOT EXISTS (SELECT 1 FROM change_counters WHERE name = 'hours')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM change_counters WHERE name = 'hours'")
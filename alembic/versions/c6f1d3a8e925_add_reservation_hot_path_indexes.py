@@ -0,0 +1,49 @@
+"""add indexes for reservation hot paths
+
+Revision ID: c6f1d3a8e925
+Revises: 8d4a6e2f1b57
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c6f1d3a8e925"
+down_revision: Union[str, Sequence[str], None] = "8d4a6e2f1b57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (reservation_date, status) lookups are already served by the leading
+    # columns of ix_reservations_date_status_window.
+    op.create_index(
+        "ix_reservation_tables_table_reservation",
+        "reservation_tables",
+        ["table_id", "reservation_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_reservations_active_window",
+        "reservations",
+        ["reservation_date", "starts_at", "ends_at"],
+        unique=False,
+        postgresql_where=sa.text("status IN ('confirmed', 'seated')"),
+    )
+    op.create_index(
+        "ix_reservations_date_time_id",
+        "reservations",
+        ["reservation_date", "reservation_time", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reservations_date_time_id", table_name="reservations")
+    op.drop_index("ix_reservations_active_window", table_name="reservations")
+    op.drop_index(
+        "ix_reservation_tables_table_reservation", table_name="reservation_tables"
+    )
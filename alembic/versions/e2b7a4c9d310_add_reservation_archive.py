@@ -0,0 +1,61 @@
+"""add reservation archive tables
+
+Revision ID: e2b7a4c9d310
+Revises: c6f1d3a8e925
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e2b7a4c9d310"
+down_revision: Union[str, Sequence[str], None] = "c6f1d3a8e925"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reservations_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("guest_name", sa.String(length=255), nullable=False),
+        sa.Column("party_size", sa.Integer(), nullable=False),
+        sa.Column("phone_number", sa.String(length=20), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("reservation_date", sa.Date(), nullable=False),
+        sa.Column("reservation_time", sa.Time(), nullable=False),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column("starts_at", sa.DateTime(), nullable=False),
+        sa.Column("ends_at", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("created_by_user_id", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("change_seq", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["created_by_user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_reservations_archive_date_time_id",
+        "reservations_archive",
+        ["reservation_date", "reservation_time", "id"],
+        unique=False,
+    )
+    op.create_table(
+        "reservation_tables_archive",
+        sa.Column("reservation_id", sa.Integer(), nullable=False),
+        sa.Column("table_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["reservation_id"], ["reservations_archive.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["table_id"], ["tables.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("reservation_id", "table_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("reservation_tables_archive")
+    op.drop_index("ix_reservations_archive_date_time_id", table_name="reservations_archive")
+    op.drop_table("reservations_archive")
@@ -0,0 +1,36 @@
+"""add business calendar
+
+Revision ID: f4c8b2d6e071
+Revises: e2b7a4c9d310
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f4c8b2d6e071"
+down_revision: Union[str, Sequence[str], None] = "e2b7a4c9d310"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Populated on first read or by `python -m rezzy.cli refresh-calendar`
+    op.create_table(
+        "business_calendar",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("open_time", sa.Time(), nullable=True),
+        sa.Column("close_time", sa.Time(), nullable=True),
+        sa.Column("is_closed", sa.Boolean(), nullable=False),
+        sa.Column("is_special", sa.Boolean(), nullable=False),
+        sa.Column("opens_at", sa.DateTime(), nullable=True),
+        sa.Column("closes_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("business_calendar")
@@ -1,14 +1,18 @@
+import asyncio
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from rezzy.core.config import get_settings
 from rezzy.core.database import get_db
 from rezzy.schemas import DailyEventsContext
 from rezzy.services.events_service import (
     get_daily_events_context,
     get_weekly_events_context,
 )
+from rezzy.services.notification_service import format_sse, get_event_hub
 
 
 router = APIRouter(prefix="/events", tags=["Events and Weather"])
@@ -29,3 +33,33 @@ def get_weekly_context(
     db: Session = Depends(get_db),
 ):
     return get_weekly_events_context(db, start_date, end_date)
+
+
+@router.get("/stream")
+async def stream_changes(request: Request, db: Session = Depends(get_db)):
+    """Server-sent events for reservation and table changes as they commit"""
+    # The session was only needed to authenticate; don't pin a pooled
+    # connection for the lifetime of the stream.
+    db.close()
+    hub = get_event_hub()
+    subscription = hub.subscribe()
+    keepalive = get_settings().event_stream_keepalive_seconds
+
+    async def events():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), keepalive)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -12,11 +12,27 @@ from rezzy.schemas import (
     SpecialHoursCreate,
     SpecialHoursUpdate,
     SpecialHoursResponse,
+    OperatingHoursChangeResponse,
+    SpecialHoursChangeResponse,
+    SpecialHoursBulk,
+    SpecialHoursBulkResult,
+    SpecialHoursDeleteResult,
+    BusinessCalendarDayResponse,
+)
+from rezzy.services import (
+    BusinessCalendarService,
+    OperatingHoursService,
+    SpecialHoursService,
 )
-from rezzy.services import OperatingHoursService, SpecialHoursService
 
 router = APIRouter(prefix="/hours", tags=["Operating Hours"])
 
+# Hours writes report the future reservations they leave outside bookable
+# times; this turns that report into a refusal.
+RejectConflicts = Query(
+    False, description="Reject the change if it would invalidate existing reservations"
+)
+
 
 # Regular Operating Hours
 @router.get("/operating", response_model=list[OperatingHoursResponse])
@@ -31,37 +47,40 @@ def get_operating_hours_for_day(day_of_week: int, db: Session = Depends(get_db))
     return OperatingHoursService.get_hours_for_day(db, day_of_week)
 
 
-@router.post("/operating", response_model=OperatingHoursResponse, status_code=201)
+@router.post("/operating", response_model=OperatingHoursChangeResponse, status_code=201)
 def create_operating_hours(
     hours: OperatingHoursCreate,
+    reject_conflicts: bool = RejectConflicts,
     db: Session = Depends(get_db),
     _admin: User = Depends(get_current_admin),
 ):
     """Create operating hours for a day of the week"""
-    return OperatingHoursService.create_hours(db, hours)
+    return OperatingHoursService.create_hours(db, hours, reject_conflicts)
 
 
 @router.post(
-    "/operating/bulk", response_model=list[OperatingHoursResponse], status_code=201
+    "/operating/bulk", response_model=list[OperatingHoursChangeResponse], status_code=201
 )
 def bulk_create_operating_hours(
     hours_list: list[OperatingHoursCreate],
+    reject_conflicts: bool = RejectConflicts,
     db: Session = Depends(get_db),
     _admin: User = Depends(get_current_admin),
 ):
     """Create operating hours for multiple days at once"""
-    return OperatingHoursService.bulk_create_hours(db, hours_list)
+    return OperatingHoursService.bulk_create_hours(db, hours_list, reject_conflicts)
 
 
-@router.patch("/operating/{day_of_week}", response_model=OperatingHoursResponse)
+@router.patch("/operating/{day_of_week}", response_model=OperatingHoursChangeResponse)
 def update_operating_hours(
     day_of_week: int,
     hours: OperatingHoursUpdate,
+    reject_conflicts: bool = RejectConflicts,
     db: Session = Depends(get_db),
     _admin: User = Depends(get_current_admin),
 ):
     """Update operating hours for a specific day"""
-    return OperatingHoursService.update_hours(db, day_of_week, hours)
+    return OperatingHoursService.update_hours(db, day_of_week, hours, reject_conflicts)
 
 
 # Special Hours (holidays, private events, etc.)
@@ -81,32 +100,59 @@ def get_special_hours_for_date(target_date: date, db: Session = Depends(get_db))
     return SpecialHoursService.get_special_hours_for_date(db, target_date)
 
 
-@router.post("/special", response_model=SpecialHoursResponse, status_code=201)
+@router.post("/special", response_model=SpecialHoursChangeResponse, status_code=201)
 def create_special_hours(
     hours: SpecialHoursCreate,
+    reject_conflicts: bool = RejectConflicts,
     db: Session = Depends(get_db),
     _admin: User = Depends(get_current_admin),
 ):
     """Create special hours for a specific date"""
-    return SpecialHoursService.create_special_hours(db, hours)
+    return SpecialHoursService.create_special_hours(db, hours, reject_conflicts)
+
+
+@router.post("/special/bulk", response_model=SpecialHoursBulkResult, status_code=201)
+def bulk_upsert_special_hours(
+    bulk: SpecialHoursBulk,
+    reject_conflicts: bool = RejectConflicts,
+    db: Session = Depends(get_db),
+    _admin: User = Depends(get_current_admin),
+):
+    """Create or replace special hours for many dates, ranges or yearly repeats at once"""
+    return SpecialHoursService.bulk_upsert_special_hours(db, bulk.entries, reject_conflicts)
 
 
-@router.patch("/special/{target_date}", response_model=SpecialHoursResponse)
+@router.patch("/special/{target_date}", response_model=SpecialHoursChangeResponse)
 def update_special_hours(
     target_date: date,
     hours: SpecialHoursUpdate,
+    reject_conflicts: bool = RejectConflicts,
     db: Session = Depends(get_db),
     _admin: User = Depends(get_current_admin),
 ):
     """Update special hours for a specific date"""
-    return SpecialHoursService.update_special_hours(db, target_date, hours)
+    return SpecialHoursService.update_special_hours(db, target_date, hours, reject_conflicts)
 
 
-@router.delete("/special/{target_date}", status_code=204)
+@router.delete("/special/{target_date}", response_model=SpecialHoursDeleteResult)
 def delete_special_hours(
     target_date: date,
+    reject_conflicts: bool = RejectConflicts,
     db: Session = Depends(get_db),
     _admin: User = Depends(get_current_admin),
 ):
-    """Delete special hours for a specific date"""
-    SpecialHoursService.delete_special_hours(db, target_date)
+    """Delete special hours for a specific date, reporting the reservations
+    the date's regular hours now leave outside bookable times"""
+    return SpecialHoursService.delete_special_hours(db, target_date, reject_conflicts)
+
+
+# Business calendar (resolved hours per date)
+@router.get("/calendar", response_model=list[BusinessCalendarDayResponse])
+def get_business_calendar(
+    start_date: date = Query(..., description="First date to include"),
+    end_date: date = Query(..., description="Last date to include"),
+    open_only: bool = Query(False, description="Only return days the restaurant is open"),
+    db: Session = Depends(get_db),
+):
+    """Get the resolved opening hours for every date in a range"""
+    return BusinessCalendarService.get_calendar(db, start_date, end_date, open_only)
@@ -1,14 +1,21 @@
 from datetime import date, time
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from rezzy.core.database import get_db
-from rezzy.core.security import get_current_user
+from rezzy.core.security import get_current_user, get_current_admin
 from rezzy.models.user import User
 from rezzy.schemas import (
     ReservationCreate,
     ReservationUpdate,
     ReservationResponse,
+    ReservationChanges,
+    ReservationBatch,
+    ReservationBatchResult,
+    AvailabilityGrid,
+    SeatingPlan,
 )
 from rezzy.services import ReservationService
 
@@ -17,15 +24,90 @@ router = APIRouter(prefix="/reservations", tags=["Reservations"])
 
 @router.get("", response_model=list[ReservationResponse])
 def get_reservations(
+    response: Response,
     start_date: date | None = Query(None, description="Filter from this date"),
     end_date: date | None = Query(None, description="Filter until this date"),
     status: str | None = Query(None, description="Filter by status"),
     table_id: int | None = Query(None, description="Filter by table"),
+    limit: int | None = Query(None, gt=0, le=1000, description="Page size"),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: str | None = Query(
+        None, description="Comma-separated fields to return instead of full reservations"
+    ),
+    include_archived: bool = Query(
+        False, description="Also search archived reservations"
+    ),
     db: Session = Depends(get_db),
 ):
-    """Get all reservations with optional filters"""
-    return ReservationService.get_reservations(
-        db, start_date, end_date, status, table_id
+    """Get reservations with optional filters, keyset paging and field projection.
+
+    When a page is full, the cursor for the next one is returned in the
+    X-Next-Cursor header.
+    """
+    if fields:
+        items, next_cursor = ReservationService.get_reservation_fields(
+            db,
+            [f.strip() for f in fields.split(",") if f.strip()],
+            start_date,
+            end_date,
+            status,
+            table_id,
+            limit,
+            cursor,
+            include_archived,
+        )
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return JSONResponse(jsonable_encoder(items), headers=headers)
+
+    reservations = ReservationService.get_reservations(
+        db, start_date, end_date, status, table_id, limit, cursor, include_archived
+    )
+    if limit is not None and len(reservations) == limit:
+        last = reservations[-1]
+        response.headers["X-Next-Cursor"] = ReservationService.encode_cursor(
+            last.reservation_date, last.reservation_time, last.id
+        )
+    return reservations
+
+
+@router.get("/changes", response_model=ReservationChanges)
+def get_reservation_changes(
+    since: int = Query(0, ge=0, description="Cursor returned by the previous poll"),
+    limit: int = Query(500, gt=0, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Reservations created, modified or cancelled since the cursor"""
+    return ReservationService.get_changes(db, since, limit)
+
+
+@router.get("/export")
+def export_reservations(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start_date: date | None = Query(None, description="Filter from this date"),
+    end_date: date | None = Query(None, description="Filter until this date"),
+    status: str | None = Query(None, description="Filter by status"),
+    table_id: int | None = Query(None, description="Filter by table"),
+    include_archived: bool = Query(
+        False, description="Also export archived reservations (left out by default)"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Stream reservations with table numbers and creator as NDJSON or CSV.
+
+    Reservations moved out by the archive command are only exported with
+    include_archived=true; without it, a range reaching before the archive
+    cutoff comes back without those rows.
+    """
+    rows = ReservationService.export_reservations(
+        db, start_date, end_date, status, table_id, include_archived=include_archived
+    )
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        ReservationService.format_export(rows, export_format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="reservations.{export_format}"'
+        },
     )
 
 
@@ -49,10 +131,68 @@ def get_available_tables(
     )
 
 
+@router.get("/next-available", response_model=list[dict])
+def find_next_available(
+    party_size: int = Query(..., gt=0),
+    reservation_date: date = Query(..., description="Preferred date"),
+    reservation_time: time = Query(..., description="Preferred time"),
+    duration_minutes: int = Query(90, gt=0),
+    horizon_days: int = Query(7, ge=0, le=60),
+    limit: int = Query(5, gt=0, le=50),
+    db: Session = Depends(get_db),
+):
+    """Find the nearest bookable slots around a preferred date and time"""
+    return ReservationService.find_next_available(
+        db,
+        party_size,
+        reservation_date,
+        reservation_time,
+        duration_minutes,
+        horizon_days,
+        limit,
+    )
+
+
+@router.get("/availability-grid", response_model=AvailabilityGrid)
+def get_availability_grid(
+    target_date: date = Query(..., alias="date"),
+    duration_minutes: int = Query(90, gt=0),
+    db: Session = Depends(get_db),
+):
+    """Largest bookable party per slot for a whole day, single tables and combos"""
+    return ReservationService.get_availability_grid(db, target_date, duration_minutes)
+
+
+@router.post("/optimize-seating", response_model=SeatingPlan)
+def optimize_seating(
+    target_date: date = Query(..., alias="date"),
+    apply: bool = Query(False, description="Apply the proposed moves"),
+    db: Session = Depends(get_db),
+    _admin: User = Depends(get_current_admin),
+):
+    """Propose (and optionally apply) table moves that consolidate free time"""
+    return ReservationService.optimize_seating(db, target_date, apply)
+
+
+@router.post("/batch", response_model=ReservationBatchResult)
+def batch_reservations(
+    batch: ReservationBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create and update many reservations in one transaction.
+
+    Each item gets the same checks as the single-item endpoints, plus checks
+    against the other items in the batch; errors are reported per item.
+    """
+    return ReservationService.batch_reservations(db, batch, current_user)
+
+
 @router.get("/{reservation_id}", response_model=ReservationResponse)
 def get_reservation(reservation_id: int, db: Session = Depends(get_db)):
-    """Get a specific reservation by ID"""
-    return ReservationService.get_reservation(db, reservation_id)
+    """Get a specific reservation by ID, live or archived"""
+    return ReservationService.get_reservation(db, reservation_id, include_archived=True)
 
 
 @router.post("", response_model=ReservationResponse, status_code=201)
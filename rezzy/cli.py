@@ -3,9 +3,21 @@ CLI utilities for Rezzy administration.
 
 Usage:
     uv run python -m rezzy.cli create-admin <username> <password>
+    uv run python -m rezzy.cli optimize-seating <YYYY-MM-DD> [--apply]
+    uv run python -m rezzy.cli archive --before <YYYY-MM-DD> [--batch-size N]
+    uv run python -m rezzy.cli refresh-calendar
+    uv run python -m rezzy.cli import-special-hours <file.json|file.csv> [--reject-conflicts]
+
+Special hours files hold one entry per row (CSV, with a header) or a JSON
+list of objects, using the fields of POST /hours/special/bulk: date,
+end_date, repeat_yearly_until, open_time, close_time, is_closed, reason.
+Reservations the new hours invalidate are listed; with --reject-conflicts
+the import is not applied if there are any.
 """
+import csv
+import json
 import sys
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from rezzy.core.database import SessionLocal
 from rezzy.core.security import hash_password
 from rezzy.models.user import User
@@ -32,13 +44,132 @@ def create_admin(username: str, password: str) -> None:
         db.close()
 
 
+def optimize_seating(target_date: date, apply: bool) -> None:
+    from rezzy.services import ReservationService
+
+    db = SessionLocal()
+    try:
+        plan = ReservationService.optimize_seating(db, target_date, apply)
+        if not plan.moves:
+            print(f"No seating improvements found for {target_date}.")
+            return
+        for move in plan.moves:
+            print(
+                f"{move.reservation_time:%H:%M} {move.guest_name}: "
+                f"tables {move.from_table_ids} -> {move.to_table_ids}"
+            )
+        print(f"Free-block score {plan.score_before} -> {plan.score_after}")
+        if plan.applied:
+            print(f"Applied {len(plan.moves)} move(s).")
+        else:
+            print("Dry run only; re-run with --apply to save these moves.")
+    finally:
+        db.close()
+
+
+def archive(before: date, batch_size: int) -> None:
+    from fastapi import HTTPException
+    from rezzy.services import ReservationService
+
+    db = SessionLocal()
+    try:
+        moved = ReservationService.archive_reservations(db, before, batch_size)
+        print(f"Archived {moved} reservation(s) dated before {before}.")
+    except HTTPException as exc:
+        print(f"Error: {exc.detail}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def refresh_calendar() -> None:
+    from rezzy.services import BusinessCalendarService
+
+    db = SessionLocal()
+    try:
+        written = BusinessCalendarService.refresh(db)
+        db.commit()
+        start, end = BusinessCalendarService.horizon()
+        print(f"Regenerated {len(written)} business calendar day(s) from {start} to {end}.")
+    finally:
+        db.close()
+
+
+def import_special_hours(path: str, reject_conflicts: bool) -> None:
+    from fastapi import HTTPException
+    from pydantic import ValidationError
+    from rezzy.schemas import SpecialHoursBulk
+    from rezzy.services import SpecialHoursService
+
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            # Blank cells mean "not set" rather than an empty string
+            rows = [{k: v for k, v in row.items() if v} for row in csv.DictReader(f)]
+        else:
+            rows = json.load(f)
+    try:
+        bulk = SpecialHoursBulk(entries=rows)
+    except ValidationError as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        result = SpecialHoursService.bulk_upsert_special_hours(
+            db, bulk.entries, reject_conflicts
+        )
+        print(
+            f"Imported special hours: {len(result.created)} created, "
+            f"{len(result.updated)} updated."
+        )
+        if result.affected_reservations:
+            print(f"{len(result.affected_reservations)} reservation(s) now fall outside opening hours:")
+            for conflict in result.affected_reservations:
+                print(
+                    f"  #{conflict.reservation_id} {conflict.guest_name} "
+                    f"({conflict.party_size}) {conflict.reservation_date} "
+                    f"{conflict.reservation_time:%H:%M}: {conflict.reason}"
+                )
+    except HTTPException as exc:
+        print(f"Error: {exc.detail}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
 def main():
     args = sys.argv[1:]
     if len(args) == 3 and args[0] == "create-admin":
         _, username, password = args
         create_admin(username, password)
+    elif len(args) in (2, 3) and args[0] == "optimize-seating":
+        apply = args[2:] == ["--apply"]
+        if len(args) == 3 and not apply:
+            print("Usage: python -m rezzy.cli optimize-seating <YYYY-MM-DD> [--apply]")
+            sys.exit(1)
+        optimize_seating(date.fromisoformat(args[1]), apply)
+    elif len(args) in (3, 5) and args[0] == "archive" and args[1] == "--before":
+        batch_size = 1000
+        if len(args) == 5:
+            if args[3] != "--batch-size":
+                print("Usage: python -m rezzy.cli archive --before <YYYY-MM-DD> [--batch-size N]")
+                sys.exit(1)
+            batch_size = int(args[4])
+        archive(date.fromisoformat(args[2]), batch_size)
+    elif args == ["refresh-calendar"]:
+        refresh_calendar()
+    elif len(args) in (2, 3) and args[0] == "import-special-hours":
+        reject_conflicts = args[2:] == ["--reject-conflicts"]
+        if len(args) == 3 and not reject_conflicts:
+            print("Usage: python -m rezzy.cli import-special-hours <file.json|file.csv> [--reject-conflicts]")
+            sys.exit(1)
+        import_special_hours(args[1], reject_conflicts)
     else:
         print("Usage: python -m rezzy.cli create-admin <username> <password>")
+        print("       python -m rezzy.cli optimize-seating <YYYY-MM-DD> [--apply]")
+        print("       python -m rezzy.cli archive --before <YYYY-MM-DD> [--batch-size N]")
+        print("       python -m rezzy.cli refresh-calendar")
+        print("       python -m rezzy.cli import-special-hours <file.json|file.csv> [--reject-conflicts]")
         sys.exit(1)
 
 
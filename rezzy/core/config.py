@@ -7,8 +7,26 @@ class Settings(BaseSettings):
     secret_key: str = "rezzy-secret-change-in-production"
 
     # Reservation settings
-    reservation_cutoff_minutes: int = 30  # Can't book within 30 min of closing
+    reservation_cutoff_minutes: int = 30  # Can't book within 30 min of closing (run refresh-calendar after changing)
     default_reservation_duration_minutes: int = 90
+    max_combo_suggestions: int = 10  # Cap on table combinations offered per lookup
+    combo_search_budget_ms: float = 5.0  # Time budget for the combination search
+    next_available_budget_ms: float = 500.0  # Time budget for a whole next-available search
+    # Max centre distance, in floor-plan position units, for tables to be combined;
+    # None (the default) lets any tables combine. Set it to suit the floor scale.
+    table_join_distance: float | None = None
+    occupancy_slot_minutes: int = 15  # Bitmap granularity for table occupancy
+    occupancy_cache_ttl_seconds: float = 30.0  # How long a day's occupancy is reused
+    availability_cache_ttl_seconds: float = 30.0
+    availability_cache_max_entries: int = 1024
+    availability_cache_url: str | None = None  # e.g. redis://localhost:6379/0 to share across workers
+    hours_cache_check_seconds: float = 5.0  # How often cached hours re-check the DB version row
+    business_calendar_horizon_days: int = 365  # How far ahead business_calendar is materialised
+
+    # Live updates (/events/stream)
+    event_stream_max_pending: int = 256  # Per-client backlog before it is told to resync
+    event_stream_keepalive_seconds: float = 15.0
+    event_notify_channel: str | None = None  # PostgreSQL NOTIFY channel to fan out across workers
 
     model_config = {
         "env_file": ".env",
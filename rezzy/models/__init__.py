@@ -3,8 +3,12 @@ from rezzy.models.restaurant import (
     Table,
     OperatingHours,
     SpecialHours,
+    BusinessCalendarDay,
     Reservation,
     reservation_tables,
+    ArchivedReservation,
+    reservation_tables_archive,
+    ChangeCounter,
 )
 from rezzy.models.user import User
 
@@ -13,7 +17,11 @@ __all__ = [
     "Table",
     "OperatingHours",
     "SpecialHours",
+    "BusinessCalendarDay",
     "Reservation",
     "reservation_tables",
+    "ArchivedReservation",
+    "reservation_tables_archive",
+    "ChangeCounter",
     "User",
 ]
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Date, Time, ForeignKey, Text, CheckConstraint, Table as SATable
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, Time, DateTime, ForeignKey, Text, CheckConstraint, Index, Table as SATable, bindparam, false, func, select, text, update
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from rezzy.core.database import Base
 
@@ -18,12 +20,28 @@ class RestaurantConfig(Base):
     )
 
 
-# Join table for reservation <-> tables (many-to-many)
+# Join table for reservation <-> tables (many-to-many). Each link carries a copy
+# of its reservation's time window and whether it still holds the table, so the
+# database itself can refuse overlapping bookings of one table.
 reservation_tables = SATable(
     "reservation_tables",
     Base.metadata,
     Column("reservation_id", Integer, ForeignKey("reservations.id", ondelete="CASCADE"), primary_key=True),
     Column("table_id", Integer, ForeignKey("tables.id", ondelete="CASCADE"), primary_key=True),
+    Column("starts_at", DateTime, nullable=True),
+    Column("ends_at", DateTime, nullable=True),
+    Column("is_active", Boolean, nullable=False, default=False, server_default=false()),
+    # The primary key leads with reservation_id; lookups by table need their own
+    Index("ix_reservation_tables_table_reservation", "table_id", "reservation_id"),
+)
+reservation_tables.append_constraint(
+    ExcludeConstraint(
+        (reservation_tables.c.table_id, "="),
+        (func.tsrange(reservation_tables.c.starts_at, reservation_tables.c.ends_at), "&&"),
+        name="ex_reservation_tables_no_overlap",
+        using="gist",
+        where=text("is_active"),
+    ).ddl_if(dialect="postgresql")
 )
 
 
@@ -80,6 +98,26 @@ class SpecialHours(Base):
     reason = Column(String(255), nullable=True)
 
 
+class BusinessCalendarDay(Base):
+    """
+    Materialised operating hours, one row per date over a rolling horizon.
+    Derived from OperatingHours and SpecialHours; never edited directly.
+    """
+    __tablename__ = "business_calendar"
+
+    date = Column(Date, primary_key=True)
+    open_time = Column(Time, nullable=True)
+    close_time = Column(Time, nullable=True)
+    is_closed = Column(Boolean, nullable=False, default=False)
+    is_special = Column(Boolean, nullable=False, default=False)
+
+    # Same shape as Reservation.starts_at/ends_at so the two join on ranges
+    opens_at = Column(DateTime, nullable=True)
+    closes_at = Column(DateTime, nullable=True)
+    # Latest bookable start (closes_at less reservation_cutoff_minutes)
+    last_seating_at = Column(DateTime, nullable=True)
+
+
 class Reservation(Base):
     """Customer reservations"""
     __tablename__ = "reservations"
@@ -95,9 +133,21 @@ class Reservation(Base):
     reservation_time = Column(Time, nullable=False)
     duration_minutes = Column(Integer, nullable=False, default=90)
 
+    # Denormalised slot boundaries so overlap checks can be range predicates in SQL
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+
     status = Column(String(20), nullable=False, default="confirmed")
     created_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
 
+    # Stamped on every write; change_seq follows commit order for delta sync
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    change_seq = Column(Integer, nullable=False, default=0, index=True)
+
     tables = relationship("Table", secondary=reservation_tables, back_populates="reservations")
     created_by = relationship("User", foreign_keys=[created_by_user_id])
 
@@ -105,6 +155,32 @@ class Reservation(Base):
     def created_by_username(self) -> str | None:
         return self.created_by.username if self.created_by else None
 
+    def sync_time_window(self) -> None:
+        """Recompute starts_at/ends_at from the date, time and duration."""
+        self.starts_at = datetime.combine(self.reservation_date, self.reservation_time)
+        self.ends_at = self.starts_at + timedelta(minutes=self.duration_minutes)
+
+    @staticmethod
+    def stamp_changes(db, reservation_ids: list[int]) -> None:
+        """Give each reservation a fresh change_seq and updated_at.
+
+        Call this as the last statement before commit: it bumps the shared
+        "reservations" counter, whose row lock is then held only until commit.
+        """
+        if not reservation_ids:
+            return
+        last_seq = ChangeCounter.bump(db, "reservations", len(reservation_ids))
+        first_seq = last_seq - len(reservation_ids) + 1
+        db.execute(
+            update(Reservation.__table__)
+            .where(Reservation.id == bindparam("rid"))
+            .values(change_seq=bindparam("seq"), updated_at=datetime.now(timezone.utc)),
+            [
+                {"rid": rid, "seq": first_seq + offset}
+                for offset, rid in enumerate(reservation_ids)
+            ],
+        )
+
     __table_args__ = (
         CheckConstraint("party_size > 0", name="positive_party_size"),
         CheckConstraint("duration_minutes > 0", name="positive_duration"),
@@ -112,4 +188,114 @@ class Reservation(Base):
             "party_size < 4 OR phone_number IS NOT NULL",
             name="phone_required_for_large_party"
         ),
+        Index(
+            "ix_reservations_date_status_window",
+            "reservation_date", "status", "starts_at", "ends_at",
+        ),
+        # Overlap checks and occupancy only ever look at bookings holding a table
+        Index(
+            "ix_reservations_active_window",
+            "reservation_date", "starts_at", "ends_at",
+            postgresql_where=text("status IN ('confirmed', 'seated')"),
+        ),
+        # Keyset pagination order for GET /reservations
+        Index(
+            "ix_reservations_date_time_id",
+            "reservation_date", "reservation_time", "id",
+        ),
+    )
+
+
+# Table links of archived reservations (plain pairs; archived bookings hold nothing)
+reservation_tables_archive = SATable(
+    "reservation_tables_archive",
+    Base.metadata,
+    Column(
+        "reservation_id",
+        Integer,
+        ForeignKey("reservations_archive.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("table_id", Integer, ForeignKey("tables.id", ondelete="CASCADE"), primary_key=True),
+)
+
+
+class ArchivedReservation(Base):
+    """Past reservations moved out of the live table; same columns and ids"""
+    __tablename__ = "reservations_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+
+    guest_name = Column(String(255), nullable=False)
+    party_size = Column(Integer, nullable=False)
+    phone_number = Column(String(20), nullable=True)
+    notes = Column(Text, nullable=True)
+
+    reservation_date = Column(Date, nullable=False)
+    reservation_time = Column(Time, nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+
+    status = Column(String(20), nullable=False)
+    created_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    change_seq = Column(Integer, nullable=False)
+
+    tables = relationship("Table", secondary=reservation_tables_archive, viewonly=True)
+    created_by = relationship("User", foreign_keys=[created_by_user_id], viewonly=True)
+
+    @property
+    def created_by_username(self) -> str | None:
+        return self.created_by.username if self.created_by else None
+
+    __table_args__ = (
+        Index(
+            "ix_reservations_archive_date_time_id",
+            "reservation_date", "reservation_time", "id",
+        ),
     )
+
+
+class ChangeCounter(Base):
+    """Named monotonic counters; bumping one row-locks it until commit"""
+    __tablename__ = "change_counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def bump(db, name: str, by: int = 1) -> int:
+        """Advance counter ``name`` by ``by`` inside the caller's transaction.
+
+        The UPDATE holds the row lock until commit, so writers are serialised
+        and values become visible in the order they were handed out.
+        """
+        bumped = db.execute(
+            update(ChangeCounter)
+            .where(ChangeCounter.name == name)
+            .values(value=ChangeCounter.value + by)
+        )
+        if bumped.rowcount == 0:
+            db.add(ChangeCounter(name=name, value=by))
+            db.flush()
+            return by
+        return db.execute(
+            select(ChangeCounter.value).where(ChangeCounter.name == name)
+        ).scalar_one()
+
+    @staticmethod
+    def lock(db, name: str) -> None:
+        """Row-lock counter ``name`` until commit without advancing it."""
+        db.execute(
+            update(ChangeCounter)
+            .where(ChangeCounter.name == name)
+            .values(value=ChangeCounter.value)
+        )
+
+    @staticmethod
+    def current(db, name: str) -> int:
+        value = db.execute(
+            select(ChangeCounter.value).where(ChangeCounter.name == name)
+        ).scalar_one_or_none()
+        return value or 0
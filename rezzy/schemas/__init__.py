@@ -16,9 +16,26 @@ from rezzy.schemas.restaurant import (
     SpecialHoursCreate,
     SpecialHoursUpdate,
     SpecialHoursResponse,
+    HoursConflict,
+    OperatingHoursChangeResponse,
+    SpecialHoursChangeResponse,
+    SpecialHoursBulkEntry,
+    SpecialHoursBulk,
+    SpecialHoursBulkResult,
+    SpecialHoursDeleteResult,
+    BusinessCalendarDayResponse,
     ReservationCreate,
     ReservationUpdate,
     ReservationResponse,
+    ReservationChanges,
+    ReservationBatch,
+    ReservationBatchUpdate,
+    ReservationBatchItemResult,
+    ReservationBatchResult,
+    AvailabilityGridSlot,
+    AvailabilityGrid,
+    SeatingMove,
+    SeatingPlan,
     ChairRearrangement,
 )
 
@@ -40,8 +57,25 @@ __all__ = [
     "SpecialHoursCreate",
     "SpecialHoursUpdate",
     "SpecialHoursResponse",
+    "HoursConflict",
+    "OperatingHoursChangeResponse",
+    "SpecialHoursChangeResponse",
+    "SpecialHoursBulkEntry",
+    "SpecialHoursBulk",
+    "SpecialHoursBulkResult",
+    "SpecialHoursDeleteResult",
+    "BusinessCalendarDayResponse",
     "ReservationCreate",
     "ReservationUpdate",
     "ReservationResponse",
+    "ReservationChanges",
+    "ReservationBatch",
+    "ReservationBatchUpdate",
+    "ReservationBatchItemResult",
+    "ReservationBatchResult",
+    "AvailabilityGridSlot",
+    "AvailabilityGrid",
+    "SeatingMove",
+    "SeatingPlan",
     "ChairRearrangement",
 ]
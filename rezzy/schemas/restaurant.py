@@ -208,6 +208,87 @@ class SpecialHoursResponse(SpecialHoursBase):
     model_config = {"from_attributes": True}
 
 
+class HoursConflict(BaseModel):
+    """A future reservation that an hours change leaves outside bookable hours"""
+    reservation_id: int
+    guest_name: str
+    party_size: int
+    reservation_date: date
+    reservation_time: time
+    reason: str
+
+
+class OperatingHoursChangeResponse(OperatingHoursResponse):
+    affected_reservations: list[HoursConflict] = []
+
+
+class SpecialHoursChangeResponse(SpecialHoursResponse):
+    affected_reservations: list[HoursConflict] = []
+
+
+class SpecialHoursBulkEntry(SpecialHoursBase):
+    # `date` alone is one day; with end_date it is an inclusive range
+    end_date: Optional[date] = None
+    # Repeat the day (or range) on the same month/day every year until this date
+    repeat_yearly_until: Optional[date] = None
+
+    @model_validator(mode="after")
+    def validate_span(self):
+        if self.end_date is not None and self.end_date < self.date:
+            raise ValueError("end_date must not be before date")
+        if self.end_date is not None and (self.end_date - self.date).days > 366:
+            raise ValueError("A date range cannot span more than a year")
+        if self.repeat_yearly_until is not None and self.repeat_yearly_until < self.date:
+            raise ValueError("repeat_yearly_until must not be before date")
+        if (
+            self.repeat_yearly_until is not None
+            and self.repeat_yearly_until.year - self.date.year > 10
+        ):
+            raise ValueError("A yearly repeat cannot run for more than 10 years")
+        return self
+
+    @property
+    def max_dates(self) -> int:
+        """Upper bound on the dates this entry expands to."""
+        days = ((self.end_date or self.date) - self.date).days + 1
+        years = (self.repeat_yearly_until or self.date).year - self.date.year + 1
+        return days * years
+
+
+class SpecialHoursBulk(BaseModel):
+    entries: list[SpecialHoursBulkEntry] = Field(..., min_length=1, max_length=500)
+
+    @model_validator(mode="after")
+    def validate_size(self):
+        if sum(entry.max_dates for entry in self.entries) > 5000:
+            raise ValueError("A bulk request can cover at most 5000 dates")
+        return self
+
+
+class SpecialHoursBulkResult(BaseModel):
+    created: list[date]
+    updated: list[date]
+    affected_reservations: list[HoursConflict] = []
+
+
+class SpecialHoursDeleteResult(BaseModel):
+    date: date
+    affected_reservations: list[HoursConflict] = []
+
+
+class BusinessCalendarDayResponse(BaseModel):
+    date: date
+    open_time: Optional[time] = None
+    close_time: Optional[time] = None
+    is_closed: bool
+    is_special: bool
+    opens_at: Optional[datetime] = None
+    closes_at: Optional[datetime] = None
+    last_seating_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
 # Reservation Schemas
 class ReservationBase(BaseModel):
     guest_name: str = Field(..., min_length=1, max_length=255)
@@ -267,6 +348,8 @@ class ReservationResponse(ReservationBase):
     status: str
     created_by_user_id: Optional[int] = None
     created_by_username: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    change_seq: int = 0
 
     model_config = {"from_attributes": True}
 
@@ -277,6 +360,67 @@ class ReservationResponse(ReservationBase):
         return self
 
 
+class ReservationBatchUpdate(ReservationUpdate):
+    id: int
+
+
+class ReservationBatch(BaseModel):
+    create: list[ReservationCreate] = Field([], max_length=500)
+    update: list[ReservationBatchUpdate] = Field([], max_length=500)
+    # Reject the whole batch if any item fails, instead of committing the rest
+    atomic: bool = True
+
+
+class ReservationBatchItemResult(BaseModel):
+    operation: str  # "create" or "update"
+    index: int  # Position within the request's create/update list
+    reservation: Optional[ReservationResponse] = None
+    error: Optional[str] = None
+
+
+class ReservationBatchResult(BaseModel):
+    committed: bool
+    results: list[ReservationBatchItemResult] = []
+
+
+class ReservationChanges(BaseModel):
+    # Highest change_seq returned; pass back as ?since= on the next poll
+    cursor: int
+    has_more: bool
+    changes: list[ReservationResponse] = []
+
+
+class AvailabilityGridSlot(BaseModel):
+    time: time
+    # Largest party that fits at one free table / at a free group of pushable tables
+    max_table_capacity: int
+    max_combo_capacity: int
+
+
+class AvailabilityGrid(BaseModel):
+    date: date
+    duration_minutes: int
+    slot_minutes: int
+    is_closed: bool
+    slots: list[AvailabilityGridSlot] = []
+
+
+class SeatingMove(BaseModel):
+    reservation_id: int
+    guest_name: str
+    reservation_time: time
+    from_table_ids: list[int]
+    to_table_ids: list[int]
+
+
+class SeatingPlan(BaseModel):
+    date: date
+    moves: list[SeatingMove] = []
+    score_before: int
+    score_after: int
+    applied: bool = False
+
+
 # Chair Rearrangement Schema
 class ChairRearrangement(BaseModel):
     table_id: int
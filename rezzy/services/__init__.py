@@ -5,6 +5,7 @@ from rezzy.services.restaurant_service import (
 from rezzy.services.hours_service import (
     OperatingHoursService,
     SpecialHoursService,
+    BusinessCalendarService,
     HoursValidationService,
 )
 from rezzy.services.reservation_service import ReservationService
@@ -14,6 +15,7 @@ __all__ = [
     "TableService",
     "OperatingHoursService",
     "SpecialHoursService",
+    "BusinessCalendarService",
     "HoursValidationService",
     "ReservationService",
 ]
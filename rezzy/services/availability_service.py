@@ -0,0 +1,731 @@
+from __future__ import annotations
+
+import json
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from math import floor, hypot
+from threading import Lock
+from time import monotonic, perf_counter
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from rezzy.core.config import get_settings
+from rezzy.models import Reservation, Table, reservation_tables
+
+
+ACTIVE_STATUSES = ("confirmed", "seated")
+
+
+@dataclass
+class DayAvailability:
+    """Per-table occupancy for one date.
+
+    Each table's bookings are folded into an integer bitmap with one bit per
+    ``slot_minutes`` slot (counted from midnight), so checking a table is a
+    single AND. Bookings or queries that do not sit on the slot grid fall back
+    to comparing the exact intervals, so rounding never changes an answer.
+    """
+
+    reservation_date: date
+    slot_minutes: int
+    bookings: dict[int, dict[int, tuple[datetime, datetime]]] = field(default_factory=dict)
+    masks: dict[int, int] = field(default_factory=dict)
+    off_grid: set[int] = field(default_factory=set)
+
+    def _minutes(self, value: datetime) -> int:
+        delta = value - datetime.combine(self.reservation_date, time())
+        return int(delta.total_seconds() // 60)
+
+    def _is_aligned(self, starts_at: datetime, ends_at: datetime) -> bool:
+        return (
+            starts_at.second == 0 == ends_at.second
+            and self._minutes(starts_at) % self.slot_minutes == 0
+            and self._minutes(ends_at) % self.slot_minutes == 0
+        )
+
+    def slot_mask(self, starts_at: datetime, ends_at: datetime) -> int:
+        first = self._minutes(starts_at) // self.slot_minutes
+        last = -(-self._minutes(ends_at) // self.slot_minutes)
+        return ((1 << max(last - first, 0)) - 1) << max(first, 0)
+
+    def copy(self) -> DayAvailability:
+        return DayAvailability(
+            self.reservation_date,
+            self.slot_minutes,
+            {table_id: dict(b) for table_id, b in self.bookings.items()},
+            dict(self.masks),
+            set(self.off_grid),
+        )
+
+    def add(
+        self,
+        reservation_id: int,
+        table_ids: list[int],
+        starts_at: datetime,
+        ends_at: datetime,
+    ) -> None:
+        for table_id in table_ids:
+            self.bookings.setdefault(table_id, {})[reservation_id] = (starts_at, ends_at)
+            self._rebuild(table_id)
+
+    def remove(self, reservation_id: int) -> None:
+        for table_id, table_bookings in self.bookings.items():
+            if table_bookings.pop(reservation_id, None) is not None:
+                self._rebuild(table_id)
+
+    def _rebuild(self, table_id: int) -> None:
+        mask = 0
+        self.off_grid.discard(table_id)
+        for starts_at, ends_at in self.bookings[table_id].values():
+            mask |= self.slot_mask(starts_at, ends_at)
+            if not self._is_aligned(starts_at, ends_at):
+                self.off_grid.add(table_id)
+        self.masks[table_id] = mask
+
+    def is_table_free(
+        self,
+        table_id: int,
+        starts_at: datetime,
+        ends_at: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> bool:
+        table_bookings = self.bookings.get(table_id)
+        if not table_bookings:
+            return True
+        if (
+            exclude_reservation_id in table_bookings
+            or table_id in self.off_grid
+            or not self._is_aligned(starts_at, ends_at)
+        ):
+            return not any(
+                starts_at < busy_end and ends_at > busy_start
+                for reservation_id, (busy_start, busy_end) in table_bookings.items()
+                if reservation_id != exclude_reservation_id
+            )
+        return not self.masks[table_id] & self.slot_mask(starts_at, ends_at)
+
+    def stranded_minutes(
+        self,
+        table_id: int,
+        starts_at: datetime,
+        ends_at: datetime,
+        window_start: datetime,
+        window_end: datetime,
+        min_gap_minutes: int,
+        exclude_reservation_id: int | None = None,
+    ) -> int:
+        """Minutes of free time a booking would leave on either side of it that
+        are too short to hold another reservation."""
+        busy = [
+            window
+            for reservation_id, window in self.bookings.get(table_id, {}).items()
+            if reservation_id != exclude_reservation_id
+        ]
+        previous_end = max(
+            [busy_end for _, busy_end in busy if busy_end <= starts_at] + [window_start]
+        )
+        next_start = min(
+            [busy_start for busy_start, _ in busy if busy_start >= ends_at] + [window_end]
+        )
+        stranded = 0
+        for gap in (starts_at - previous_end, next_start - ends_at):
+            minutes = int(gap.total_seconds() // 60)
+            if 0 < minutes < min_gap_minutes:
+                stranded += minutes
+        return stranded
+
+    def free_tables(
+        self,
+        tables: list[Table],
+        starts_at: datetime,
+        ends_at: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> list[Table]:
+        return [
+            t for t in tables
+            if self.is_table_free(t.id, starts_at, ends_at, exclude_reservation_id)
+        ]
+
+
+def load_day_availability(db: Session, reservation_date: date) -> DayAvailability:
+    """Load every active booking for a date and its table links in one query."""
+    return load_range_availability(db, reservation_date, reservation_date)[reservation_date]
+
+
+def load_range_availability(
+    db: Session, start_date: date, end_date: date
+) -> dict[date, DayAvailability]:
+    """Load occupancy for every date in an inclusive range in one query."""
+    query = (
+        db.query(
+            Reservation.id,
+            Reservation.reservation_date,
+            reservation_tables.c.table_id,
+            Reservation.starts_at,
+            Reservation.ends_at,
+        )
+        .join(reservation_tables, reservation_tables.c.reservation_id == Reservation.id)
+        .filter(
+            Reservation.reservation_date >= start_date,
+            Reservation.reservation_date <= end_date,
+            Reservation.status.in_(ACTIVE_STATUSES),
+        )
+    )
+
+    slot_minutes = get_settings().occupancy_slot_minutes
+    days: dict[date, DayAvailability] = {}
+    day = start_date
+    while day <= end_date:
+        days[day] = DayAvailability(day, slot_minutes)
+        day += timedelta(days=1)
+    for reservation_id, reservation_date, table_id, starts_at, ends_at in query:
+        days[reservation_date].add(reservation_id, [table_id], starts_at, ends_at)
+    return days
+
+
+# Occupancy built per date is kept for a short while and patched in place by
+# ReservationService writes. Each entry remembers the availability cache
+# generation it was loaded at and is only reused while that generation is
+# current, so with a shared backend a bump from any worker retires it.
+_day_cache: dict[date, tuple[float, tuple[int, int], DayAvailability]] = {}
+_day_cache_lock = Lock()
+
+
+def get_day_availability(db: Session, reservation_date: date) -> DayAvailability:
+    ttl = get_settings().occupancy_cache_ttl_seconds
+    cache = get_availability_cache()
+    generation = cache.generation(reservation_date)
+    with _day_cache_lock:
+        cached = _day_cache.get(reservation_date)
+        if cached and cached[1] == generation and monotonic() - cached[0] < ttl:
+            return cached[2]
+
+    # The generation is read before loading. If a booking commits during the
+    # load it bumps the generation (with nothing cached to patch), and the
+    # load is returned to this caller but not cached.
+    day = load_day_availability(db, reservation_date)
+    if cache.generation(reservation_date) == generation:
+        with _day_cache_lock:
+            _day_cache[reservation_date] = (monotonic(), generation, day)
+    return day
+
+
+def record_reservation(reservation: Reservation, previous_date: date | None = None) -> None:
+    """Reflect a committed create, update or cancel in any cached occupancy.
+
+    Cached days are patched copy-on-write so concurrent readers never see a
+    half-applied change. A day is only patched if it was current right up to
+    this change; anything older is dropped and reloaded on next use.
+    """
+    cache = get_availability_cache()
+    for day_date in {previous_date, reservation.reservation_date} - {None}:
+        superseded, current = cache.invalidate(day_date)
+        with _day_cache_lock:
+            cached = _day_cache.get(day_date)
+            if not cached or cached[1] == current:
+                continue
+            if cached[1] != superseded:
+                del _day_cache[day_date]
+                continue
+            day = cached[2].copy()
+            day.remove(reservation.id)
+            if day_date == reservation.reservation_date and reservation.status in ACTIVE_STATUSES:
+                day.add(
+                    reservation.id,
+                    [t.id for t in reservation.tables],
+                    reservation.starts_at,
+                    reservation.ends_at,
+                )
+            _day_cache[day_date] = (cached[0], current, day)
+
+
+class LocalCacheBackend:
+    """In-process LRU store with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, *names: str) -> list[int]:
+        with self._lock:
+            return [self._generations.get(name, 0) for name in names]
+
+    def bump(self, name: str) -> int:
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            return self._generations[name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisCacheBackend:
+    """Shared store so every worker sees the same answers and invalidations."""
+
+    def __init__(self, url: str, prefix: str = "rezzy:availability:"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "availability_cache_url is set but the 'redis' extra is not installed "
+                "(pip install 'rezzy[redis]')"
+            ) from exc
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> str | None:
+        raw = self._client.get(self._prefix + key)
+        return raw.decode() if raw is not None else None
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self._client.set(self._prefix + key, value, ex=max(1, int(ttl_seconds)))
+
+    def generations(self, *names: str) -> list[int]:
+        values = self._client.mget([f"{self._prefix}gen:{name}" for name in names])
+        return [int(value or 0) for value in values]
+
+    def bump(self, name: str) -> int:
+        return self._client.incr(f"{self._prefix}gen:{name}")
+
+    def clear(self) -> None:
+        self.bump("all")
+
+
+class AvailabilityCache:
+    """Read-through cache of availability answers keyed by date and parameters.
+
+    Keys embed a generation counter for their date and a global one, so
+    invalidating a date (or everything) is a single counter bump and stale
+    entries simply age out of the store.
+    """
+
+    def __init__(self, backend: LocalCacheBackend | RedisCacheBackend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    def generation(self, reservation_date: date) -> tuple[int, int]:
+        everything, this_day = self.backend.generations("all", reservation_date.isoformat())
+        return everything, this_day
+
+    def get_or_compute(self, reservation_date: date, params: tuple, compute: Callable[[], Any]):
+        """
+        Return the cached answer, or compute and store it. The key is built
+        once, before computing, so an answer computed from data that a
+        concurrent write has since replaced is stored under the retired
+        generation and never served as current.
+        """
+        everything, this_day = self.generation(reservation_date)
+        key = (
+            f"{everything}:{reservation_date.isoformat()}:{this_day}:"
+            + json.dumps(params, default=str)
+        )
+        raw = self.backend.get(key)
+        if raw is not None:
+            return json.loads(raw)
+        value = compute()
+        self.backend.set(key, json.dumps(value), self.ttl_seconds)
+        return value
+
+    def invalidate(self, reservation_date: date) -> tuple[tuple[int, int], tuple[int, int]]:
+        """Retire a date's entries; returns its generation before and after."""
+        this_day = self.backend.bump(reservation_date.isoformat())
+        everything = self.backend.generations("all")[0]
+        return (everything, this_day - 1), (everything, this_day)
+
+    def invalidate_all(self) -> None:
+        self.backend.bump("all")
+
+
+_availability_cache: AvailabilityCache | None = None
+
+
+def get_availability_cache() -> AvailabilityCache:
+    global _availability_cache
+    if _availability_cache is None:
+        settings = get_settings()
+        if settings.availability_cache_url:
+            backend = RedisCacheBackend(settings.availability_cache_url)
+        else:
+            backend = LocalCacheBackend(settings.availability_cache_max_entries)
+        _availability_cache = AvailabilityCache(
+            backend, settings.availability_cache_ttl_seconds
+        )
+    return _availability_cache
+
+
+def invalidate_availability(*dates: date | None) -> None:
+    """Drop cached answers for the given dates, e.g. after a booking changes."""
+    cache = get_availability_cache()
+    for day in set(dates) - {None}:
+        cache.invalidate(day)
+
+
+def invalidate_all_availability() -> None:
+    """Drop every cached answer and occupancy, e.g. after tables or hours change."""
+    with _day_cache_lock:
+        _day_cache.clear()
+    get_availability_cache().invalidate_all()
+
+
+def clear_availability_cache() -> None:
+    with _day_cache_lock:
+        _day_cache.clear()
+    get_availability_cache().backend.clear()
+
+
+def rank_seating_options(
+    options: list[dict],
+    day: DayAvailability,
+    party_size: int,
+    starts_at: datetime,
+    ends_at: datetime,
+    window_start: datetime,
+    window_end: datetime,
+    min_gap_minutes: int,
+    exclude_reservation_id: int | None = None,
+) -> list[dict]:
+    """Order seating options best fit first.
+
+    Options are compared on seats left empty, then on how many minutes of
+    the evening they would strand on their tables (gaps too short for another
+    booking), then on how many tables they tie up.
+    """
+
+    def fit(option: dict) -> tuple[int, int, int]:
+        stranded = sum(
+            day.stranded_minutes(
+                table_id,
+                starts_at,
+                ends_at,
+                window_start,
+                window_end,
+                min_gap_minutes,
+                exclude_reservation_id,
+            )
+            for table_id in option["table_ids"]
+        )
+        return option["capacity"] - party_size, stranded, len(option["table_ids"])
+
+    return sorted(options, key=fit)
+
+
+class TableAdjacency:
+    """Which tables sit close enough on the floor plan to be pushed together.
+
+    Tables are bucketed into a grid whose cells are one join distance wide, so
+    each table is only compared against the tables in the nine cells around it.
+    """
+
+    def __init__(self, tables: list[Table], join_distance: float):
+        self.join_distance = join_distance
+        self.neighbors: dict[int, set[int]] = {t.id: set() for t in tables}
+
+        buckets: dict[tuple[int, int], list[Table]] = defaultdict(list)
+        for table in tables:
+            buckets[self._cell(table)].append(table)
+
+        for (cell_x, cell_y), members in buckets.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for other in buckets.get((cell_x + dx, cell_y + dy), ()):
+                        for table in members:
+                            if table.id != other.id and self._within_reach(table, other):
+                                self.neighbors[table.id].add(other.id)
+
+    def _cell(self, table: Table) -> tuple[int, int]:
+        size = self.join_distance or 1.0
+        return floor(table.x_position / size), floor(table.y_position / size)
+
+    def _within_reach(self, a: Table, b: Table) -> bool:
+        return hypot(a.x_position - b.x_position, a.y_position - b.y_position) <= self.join_distance
+
+    def are_adjacent(self, a_id: int, b_id: int) -> bool:
+        return b_id in self.neighbors.get(a_id, ())
+
+    def clusters(self, tables: list[Table]) -> list[list[Table]]:
+        """Split ``tables`` into groups connected through neighbours among them."""
+        by_id = {t.id: t for t in tables}
+        seen: set[int] = set()
+        clusters: list[list[Table]] = []
+        for table in tables:
+            if table.id in seen:
+                continue
+            seen.add(table.id)
+            cluster, frontier = [], [table.id]
+            while frontier:
+                current = frontier.pop()
+                cluster.append(by_id[current])
+                for neighbor in self.neighbors.get(current, ()):
+                    if neighbor in by_id and neighbor not in seen:
+                        seen.add(neighbor)
+                        frontier.append(neighbor)
+            clusters.append(cluster)
+        return clusters
+
+
+def find_table_combinations(
+    tables: list[Table],
+    party_size: int,
+    max_results: int,
+    time_budget_ms: float,
+    adjacency: TableAdjacency | None = None,
+) -> list[list[Table]]:
+    """Find combinations using the fewest tables that together seat the party.
+
+    Tables are explored largest-first, so a branch is abandoned as soon as the
+    largest capacities still available can no longer reach the party size.
+    With an ``adjacency`` index only connected groups of neighbouring tables
+    are enumerated, and connected clusters that can't seat the party are
+    dropped up front. The search stops after ``max_results`` combos or when
+    the time budget runs out, whichever comes first.
+    """
+    if adjacency is not None:
+        # Combos never span clusters, so a cluster too small for the party
+        # can't contribute; the capacity bounds below only see the rest.
+        tables = [
+            t for cluster in adjacency.clusters(tables)
+            if sum(c.current_chairs for c in cluster) >= party_size
+            for t in cluster
+        ]
+    ordered = sorted(tables, key=lambda t: t.current_chairs, reverse=True)
+    capacities = [t.current_chairs for t in ordered]
+    # prefix[i] is the combined capacity of the i largest tables
+    prefix = [0]
+    for capacity in capacities:
+        prefix.append(prefix[-1] + capacity)
+
+    neighbors: list[set[int]] = []
+    if adjacency is not None:
+        position = {t.id: i for i, t in enumerate(ordered)}
+        neighbors = [
+            {position[n] for n in adjacency.neighbors.get(t.id, ()) if n in position}
+            for t in ordered
+        ]
+
+    deadline = perf_counter() + time_budget_ms / 1000
+    results: list[list[Table]] = []
+    picked: list[int] = []
+
+    def best_case(start: int, count: int) -> int:
+        """Largest capacity reachable with ``count`` tables from index ``start`` on."""
+        return prefix[min(start + count, len(ordered))] - prefix[start]
+
+    def record(seats: int) -> bool:
+        if seats >= party_size:
+            results.append([ordered[i] for i in picked])
+        return len(results) < max_results and perf_counter() < deadline
+
+    def search(start: int, seats: int, size: int) -> bool:
+        """Extend ``picked`` to ``size`` tables; return False once the search must stop."""
+        remaining = size - len(picked)
+        if remaining == 0:
+            return record(seats)
+        for i in range(start, len(ordered) - remaining + 1):
+            # Best case from here is the next `remaining` tables, which only shrinks with i
+            if seats + best_case(i, remaining) < party_size:
+                break
+            picked.append(i)
+            keep_going = search(i + 1, seats + capacities[i], size)
+            picked.pop()
+            if not keep_going:
+                return False
+        return perf_counter() < deadline
+
+    def grow(seed: int, extension: list[int], seats: int, size: int) -> bool:
+        """Enumerate connected groups whose lowest index is ``seed`` (ESU-style,
+        so each group is produced exactly once)."""
+        remaining = size - len(picked)
+        if remaining == 0:
+            return record(seats)
+        if seats + best_case(seed + 1, remaining) < party_size:
+            return perf_counter() < deadline
+        candidates = sorted(extension)
+        while candidates:
+            w = candidates.pop(0)
+            # Only add neighbours of w that no current member could already reach
+            exclusive = sorted(
+                u for u in neighbors[w]
+                if u > seed and not any(u == m or u in neighbors[m] for m in picked)
+            )
+            picked.append(w)
+            keep_going = grow(seed, candidates + exclusive, seats + capacities[w], size)
+            picked.pop()
+            if not keep_going:
+                return False
+        return perf_counter() < deadline
+
+    for size in range(2, len(ordered) + 1):
+        if prefix[size] < party_size:
+            continue
+        if adjacency is None:
+            search(0, 0, size)
+        else:
+            for seed in range(len(ordered)):
+                if capacities[seed] + best_case(seed + 1, size - 1) < party_size:
+                    break
+                picked.append(seed)
+                keep_going = grow(
+                    seed, [u for u in neighbors[seed] if u > seed], capacities[seed], size
+                )
+                picked.pop()
+                if not keep_going:
+                    break
+        # Only offer combos of the smallest sufficient size
+        if results or perf_counter() >= deadline:
+            break
+    return results
+
+
+@dataclass
+class SeatingBooking:
+    """One reservation as seen by the seating optimiser."""
+
+    reservation_id: int
+    party_size: int
+    starts_at: datetime
+    ends_at: datetime
+    table_ids: list[int]
+    movable: bool
+
+
+def free_block_score(
+    capacity: int,
+    windows: list[tuple[datetime, datetime]],
+    window_start: datetime,
+    window_end: datetime,
+) -> int:
+    """Score a table's free time as capacity x sum of squared free-block minutes.
+
+    Squaring rewards one long block over several short ones, and weighting by
+    capacity keeps big tables open for the big parties that need them.
+    """
+    score = 0
+    cursor = window_start
+    for busy_start, busy_end in sorted(windows):
+        if busy_start > cursor:
+            score += int((min(busy_start, window_end) - cursor).total_seconds() // 60) ** 2
+        cursor = max(cursor, busy_end)
+        if cursor >= window_end:
+            break
+    if cursor < window_end:
+        score += int((window_end - cursor).total_seconds() // 60) ** 2
+    return capacity * score
+
+
+def optimize_seating(
+    tables: list[Table],
+    bookings: list[SeatingBooking],
+    window_start: datetime,
+    window_end: datetime,
+    max_rounds: int = 50,
+) -> dict[int, list[int]]:
+    """Reassign movable single-table bookings to maximise contiguous free time.
+
+    Starting from the current assignment, repeatedly applies the best single
+    relocation or pairwise swap that raises the summed free_block_score until
+    nothing improves. Returns the new table ids for every booking that moved.
+    """
+    capacity = {t.id: t.current_chairs for t in tables}
+    by_id = {b.reservation_id: b for b in bookings}
+    placed: dict[int, dict[int, tuple[datetime, datetime]]] = {t.id: {} for t in tables}
+    current: dict[int, int] = {}
+    for booking in bookings:
+        for table_id in booking.table_ids:
+            placed.setdefault(table_id, {})[booking.reservation_id] = (
+                booking.starts_at, booking.ends_at
+            )
+    movable = sorted(
+        (
+            b for b in bookings
+            if b.movable and len(b.table_ids) == 1 and b.table_ids[0] in capacity
+        ),
+        key=lambda b: (-b.party_size, b.starts_at, b.reservation_id),
+    )
+    for booking in movable:
+        current[booking.reservation_id] = booking.table_ids[0]
+
+    def table_score(table_id: int, without: frozenset[int] | set[int] = frozenset(), extra=()) -> int:
+        windows = [w for rid, w in placed[table_id].items() if rid not in without]
+        windows.extend(extra)
+        return free_block_score(capacity[table_id], windows, window_start, window_end)
+
+    def fits(booking: SeatingBooking, table_id: int, without: set[int]) -> bool:
+        return capacity[table_id] >= booking.party_size and not any(
+            booking.starts_at < busy_end and booking.ends_at > busy_start
+            for rid, (busy_start, busy_end) in placed[table_id].items()
+            if rid not in without
+        )
+
+    def move(booking: SeatingBooking, source: int, target: int) -> None:
+        window = placed[source].pop(booking.reservation_id)
+        placed[target][booking.reservation_id] = window
+        current[booking.reservation_id] = target
+
+    for _ in range(max_rounds):
+        best_gain, best_move = 0, None
+        for booking in movable:
+            source = current[booking.reservation_id]
+            rid = booking.reservation_id
+            window = (booking.starts_at, booking.ends_at)
+            before_source = table_score(source)
+            after_source = table_score(source, {rid})
+            for target in capacity:
+                if target == source or not fits(booking, target, {rid}):
+                    continue
+                gain = (
+                    after_source + table_score(target, extra=[window])
+                    - before_source - table_score(target)
+                )
+                if gain > best_gain:
+                    best_gain, best_move = gain, ((booking, source, target),)
+
+        for i, a in enumerate(movable):
+            for b in movable[i + 1:]:
+                table_a, table_b = current[a.reservation_id], current[b.reservation_id]
+                if table_a == table_b:
+                    continue
+                both = {a.reservation_id, b.reservation_id}
+                if not (fits(a, table_b, both) and fits(b, table_a, both)):
+                    continue
+                gain = (
+                    table_score(table_a, both, [(b.starts_at, b.ends_at)])
+                    + table_score(table_b, both, [(a.starts_at, a.ends_at)])
+                    - table_score(table_a) - table_score(table_b)
+                )
+                if gain > best_gain:
+                    best_gain, best_move = gain, ((a, table_a, table_b), (b, table_b, table_a))
+
+        if best_move is None:
+            break
+        for booking, source, target in best_move:
+            move(booking, source, target)
+
+    return {
+        rid: [table_id]
+        for rid, table_id in current.items()
+        if by_id[rid].table_ids != [table_id]
+    }
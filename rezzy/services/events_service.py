@@ -4,7 +4,7 @@ import html
 import json
 import re
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
 from typing import Any
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
@@ -117,10 +117,12 @@ def get_weekly_events_context(
     else:
         weather_error = "Set a weather location in Settings to show hourly weather."
 
+    hours_by_date = HoursValidationService.get_hours_for_range(db, start_date, end_date)
+
     contexts: list[DailyEventsContext] = []
     day = start_date
     while day <= end_date:
-        window = get_operating_window(db, day)
+        window = operating_window(day, hours_by_date[day])
         if window.is_closed:
             contexts.append(
                 DailyEventsContext(
@@ -175,9 +177,15 @@ def fetch_all_events() -> tuple[list[VenueEvent], list[str]]:
 
 
 def get_operating_window(db: Session, target_date: date) -> OperatingWindow:
-    open_time, close_time, is_closed = HoursValidationService.get_hours_for_date(
-        db, target_date
+    return operating_window(
+        target_date, HoursValidationService.get_hours_for_date(db, target_date)
     )
+
+
+def operating_window(
+    target_date: date, hours: tuple[time | None, time | None, bool]
+) -> OperatingWindow:
+    open_time, close_time, is_closed = hours
     if is_closed or open_time is None or close_time is None:
         return OperatingWindow(None, None, True)
 
@@ -1,15 +1,142 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import date, time, datetime, timedelta
+from threading import Lock
+from time import monotonic
+from sqlalchemy import and_, bindparam, insert, or_, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from rezzy.models import OperatingHours, SpecialHours
+from rezzy.models import (
+    BusinessCalendarDay,
+    ChangeCounter,
+    OperatingHours,
+    Reservation,
+    SpecialHours,
+)
 from rezzy.schemas import (
     OperatingHoursCreate,
     OperatingHoursUpdate,
     SpecialHoursCreate,
     SpecialHoursUpdate,
+    SpecialHoursBulkEntry,
+    SpecialHoursBulkResult,
+    SpecialHoursDeleteResult,
+    HoursConflict,
 )
 from rezzy.core.config import get_settings
+from rezzy.services.availability_service import (
+    ACTIVE_STATUSES,
+    invalidate_all_availability,
+    invalidate_availability,
+)
+
+
+Hours = tuple[time | None, time | None, bool]
+
+
+@dataclass
+class HoursSnapshot:
+    """Every weekly and special hours row, as of one hours version."""
+    version: int
+    weekly: dict[int, Hours]
+    special: dict[date, Hours]
+    checked_at: float
+
+    def resolve(self, target_date: date) -> Hours:
+        return (
+            self.special.get(target_date)
+            or self.weekly.get(target_date.weekday())
+            or (None, None, True)
+        )
+
+
+# Hours change a few times a year, so each process keeps them in memory.
+# Local writes drop the snapshot at once; writes from other workers bump the
+# "hours" change counter, which is re-checked every hours_cache_check_seconds.
+# The lock only guards swapping snapshots; queries run outside it.
+_hours_snapshot: HoursSnapshot | None = None
+_hours_cleared = 0
+_hours_lock = Lock()
+
+
+def get_hours_snapshot(db: Session) -> HoursSnapshot:
+    global _hours_snapshot
+    interval = get_settings().hours_cache_check_seconds
+    with _hours_lock:
+        snapshot, cleared = _hours_snapshot, _hours_cleared
+    now = monotonic()
+    if snapshot is not None and now - snapshot.checked_at < interval:
+        return snapshot
+
+    # Read the version before the rows: a write landing in between then
+    # only causes one extra reload, never a stale snapshot.
+    version = ChangeCounter.current(db, "hours")
+    if snapshot is not None and snapshot.version == version:
+        snapshot.checked_at = now
+        return snapshot
+
+    loaded = HoursSnapshot(version, *_load_hours(db), checked_at=now)
+    with _hours_lock:
+        # A local write cleared the cache while we loaded: our rows may
+        # predate it, so use them for this call but don't keep them
+        if _hours_cleared == cleared:
+            _hours_snapshot = loaded
+    return loaded
+
+
+def _load_hours(db: Session) -> tuple[dict[int, Hours], dict[date, Hours]]:
+    weekly = {
+        h.day_of_week: (h.open_time, h.close_time, h.is_closed)
+        for h in db.query(OperatingHours)
+    }
+    special = {
+        h.date: (h.open_time, h.close_time, h.is_closed)
+        for h in db.query(SpecialHours)
+    }
+    return weekly, special
+
+
+def clear_hours_cache() -> None:
+    global _hours_snapshot, _hours_cleared
+    with _hours_lock:
+        _hours_snapshot = None
+        _hours_cleared += 1
+
+
+def _commit_hours_change(
+    db: Session,
+    dates: Iterable[date] | None = None,
+    weekdays: Iterable[int] | None = None,
+    reject_conflicts: bool = False,
+) -> list[HoursConflict]:
+    """
+    Commit an hours write. The shared version bump and the business calendar
+    rows for the affected dates (or weekdays) land in the same transaction.
+
+    Returns the future reservations the new hours leave outside bookable
+    times; with reject_conflicts, any such reservation rolls the change back.
+    """
+    ChangeCounter.bump(db, "hours")
+    if dates is not None:
+        dates = list(dates)
+    refreshed = BusinessCalendarService.refresh(db, dates=dates, weekdays=weekdays)
+    conflicts = BusinessCalendarService.find_conflicts(
+        db, refreshed if dates is None else dates, weekdays or ()
+    )
+    if conflicts and reject_conflicts:
+        db.rollback()
+        listed = ", ".join(
+            f"#{c.reservation_id} {c.guest_name} at {c.reservation_date} {c.reservation_time:%H:%M}"
+            for c in conflicts
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Hours change would invalidate {len(conflicts)} reservation(s): {listed}",
+        )
+    db.commit()
+    clear_hours_cache()
+    return conflicts
 
 
 class OperatingHoursService:
@@ -26,7 +153,9 @@ class OperatingHoursService:
         )
 
     @staticmethod
-    def create_hours(db: Session, hours: OperatingHoursCreate) -> OperatingHours:
+    def create_hours(
+        db: Session, hours: OperatingHoursCreate, reject_conflicts: bool = False
+    ) -> OperatingHours:
         existing = OperatingHoursService.get_hours_for_day(db, hours.day_of_week)
         if existing:
             raise HTTPException(
@@ -35,14 +164,26 @@ class OperatingHoursService:
             )
         db_hours = OperatingHours(**hours.model_dump())
         db.add(db_hours)
-        db.commit()
+        conflicts = _commit_hours_change(
+            db, weekdays=[hours.day_of_week], reject_conflicts=reject_conflicts
+        )
         db.refresh(db_hours)
+        db_hours.affected_reservations = conflicts
+        invalidate_all_availability()
         return db_hours
 
     @staticmethod
     def update_hours(
-        db: Session, day_of_week: int, hours: OperatingHoursUpdate
+        db: Session,
+        day_of_week: int,
+        hours: OperatingHoursUpdate,
+        reject_conflicts: bool = False,
     ) -> OperatingHours:
+        """
+        Update a weekday's hours. Future reservations the new hours leave
+        outside bookable times are reported as ``affected_reservations`` on
+        the result, or with reject_conflicts block the change.
+        """
         db_hours = OperatingHoursService.get_hours_for_day(db, day_of_week)
         if not db_hours:
             raise HTTPException(
@@ -70,13 +211,17 @@ class OperatingHoursService:
 
         for field, value in update_data.items():
             setattr(db_hours, field, value)
-        db.commit()
+        conflicts = _commit_hours_change(
+            db, weekdays=[day_of_week], reject_conflicts=reject_conflicts
+        )
         db.refresh(db_hours)
+        db_hours.affected_reservations = conflicts
+        invalidate_all_availability()
         return db_hours
 
     @staticmethod
     def bulk_create_hours(
-        db: Session, hours_list: list[OperatingHoursCreate]
+        db: Session, hours_list: list[OperatingHoursCreate], reject_conflicts: bool = False
     ) -> list[OperatingHours]:
         """Create operating hours for multiple days at once"""
         requested_days = [hours.day_of_week for hours in hours_list]
@@ -108,9 +253,15 @@ class OperatingHoursService:
             db_hours = OperatingHours(**hours.model_dump())
             db.add(db_hours)
             created.append(db_hours)
-        db.commit()
+        conflicts = _commit_hours_change(
+            db, weekdays=requested_days, reject_conflicts=reject_conflicts
+        )
         for h in created:
             db.refresh(h)
+            h.affected_reservations = [
+                c for c in conflicts if c.reservation_date.weekday() == h.day_of_week
+            ]
+        invalidate_all_availability()
         return created
 
 
@@ -131,7 +282,9 @@ class SpecialHoursService:
         return db.query(SpecialHours).filter(SpecialHours.date == target_date).first()
 
     @staticmethod
-    def create_special_hours(db: Session, hours: SpecialHoursCreate) -> SpecialHours:
+    def create_special_hours(
+        db: Session, hours: SpecialHoursCreate, reject_conflicts: bool = False
+    ) -> SpecialHours:
         existing = SpecialHoursService.get_special_hours_for_date(db, hours.date)
         if existing:
             raise HTTPException(
@@ -140,13 +293,20 @@ class SpecialHoursService:
             )
         db_hours = SpecialHours(**hours.model_dump())
         db.add(db_hours)
-        db.commit()
+        conflicts = _commit_hours_change(
+            db, dates=[hours.date], reject_conflicts=reject_conflicts
+        )
         db.refresh(db_hours)
+        db_hours.affected_reservations = conflicts
+        invalidate_availability(db_hours.date)
         return db_hours
 
     @staticmethod
     def update_special_hours(
-        db: Session, target_date: date, hours: SpecialHoursUpdate
+        db: Session,
+        target_date: date,
+        hours: SpecialHoursUpdate,
+        reject_conflicts: bool = False,
     ) -> SpecialHours:
         db_hours = SpecialHoursService.get_special_hours_for_date(db, target_date)
         if not db_hours:
@@ -175,12 +335,18 @@ class SpecialHoursService:
 
         for field, value in update_data.items():
             setattr(db_hours, field, value)
-        db.commit()
+        conflicts = _commit_hours_change(
+            db, dates=[target_date], reject_conflicts=reject_conflicts
+        )
         db.refresh(db_hours)
+        db_hours.affected_reservations = conflicts
+        invalidate_availability(target_date)
         return db_hours
 
     @staticmethod
-    def delete_special_hours(db: Session, target_date: date) -> None:
+    def delete_special_hours(
+        db: Session, target_date: date, reject_conflicts: bool = False
+    ) -> SpecialHoursDeleteResult:
         db_hours = SpecialHoursService.get_special_hours_for_date(db, target_date)
         if not db_hours:
             raise HTTPException(
@@ -188,7 +354,297 @@ class SpecialHoursService:
                 detail=f"Special hours for {target_date} not found",
             )
         db.delete(db_hours)
+        conflicts = _commit_hours_change(
+            db, dates=[target_date], reject_conflicts=reject_conflicts
+        )
+        invalidate_availability(target_date)
+        return SpecialHoursDeleteResult(date=target_date, affected_reservations=conflicts)
+
+    @staticmethod
+    def expand_dates(entry: SpecialHoursBulkEntry) -> list[date]:
+        """Every date a bulk entry covers, across its range and yearly repeats."""
+        span = ((entry.end_date or entry.date) - entry.date).days
+        last = entry.repeat_yearly_until or entry.date
+        dates = []
+        for year in range(entry.date.year, last.year + 1):
+            try:
+                first = entry.date.replace(year=year)
+            except ValueError:  # Feb 29 outside a leap year
+                continue
+            if first > last:
+                break
+            dates.extend(first + timedelta(days=offset) for offset in range(span + 1))
+        return dates
+
+    @staticmethod
+    def bulk_upsert_special_hours(
+        db: Session, entries: list[SpecialHoursBulkEntry], reject_conflicts: bool = False
+    ) -> SpecialHoursBulkResult:
+        """
+        Create or replace special hours for every date the entries cover,
+        with one existence query and a single commit.
+        """
+        values_by_date = {}
+        duplicate_dates = set()
+        for entry in entries:
+            values = entry.model_dump(include={"open_time", "close_time", "is_closed", "reason"})
+            for day in SpecialHoursService.expand_dates(entry):
+                if day in values_by_date:
+                    duplicate_dates.add(day)
+                values_by_date[day] = values
+        if duplicate_dates:
+            dates = ", ".join(str(day) for day in sorted(duplicate_dates))
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Duplicate special hours in request for date(s): {dates}",
+            )
+
+        existing = {
+            day
+            for (day,) in db.query(SpecialHours.date)
+            .filter(SpecialHours.date.in_(values_by_date))
+            .all()
+        }
+        created = sorted(day for day in values_by_date if day not in existing)
+        updated = sorted(existing)
+
+        if created:
+            db.execute(
+                insert(SpecialHours),
+                [{"date": day, **values_by_date[day]} for day in created],
+            )
+        if updated:
+            db.execute(
+                update(SpecialHours.__table__)
+                .where(SpecialHours.date == bindparam("target_date"))
+                .values(
+                    open_time=bindparam("open_time"),
+                    close_time=bindparam("close_time"),
+                    is_closed=bindparam("is_closed"),
+                    reason=bindparam("reason"),
+                ),
+                [{"target_date": day, **values_by_date[day]} for day in updated],
+            )
+        conflicts = _commit_hours_change(
+            db, dates=values_by_date, reject_conflicts=reject_conflicts
+        )
+        invalidate_availability(*values_by_date)
+        return SpecialHoursBulkResult(
+            created=created, updated=updated, affected_reservations=conflicts
+        )
+
+
+def _upsert_calendar_rows(db: Session, rows: list[dict]) -> None:
+    """Insert or overwrite calendar rows, so concurrent fills of the same
+    dates both succeed instead of racing on the primary key."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    statement = dialect_insert(BusinessCalendarDay.__table__)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["date"],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column != "date"
+            },
+        ),
+        rows,
+    )
+
+
+class BusinessCalendarService:
+    """
+    Maintains business_calendar, the per-date materialisation of weekly and
+    special hours from today to business_calendar_horizon_days ahead. Hours
+    writes regenerate only the dates they affect; past rows are left as they
+    were so reports keep the hours that actually applied.
+    """
+
+    @staticmethod
+    def horizon() -> tuple[date, date]:
+        today = date.today()
+        return today, today + timedelta(days=get_settings().business_calendar_horizon_days)
+
+    @staticmethod
+    def refresh(
+        db: Session,
+        dates: Iterable[date] | None = None,
+        weekdays: Iterable[int] | None = None,
+    ) -> list[date]:
+        """
+        Regenerate calendar rows inside the horizon: the given dates, every
+        date on the given weekdays, or (with neither) the whole horizon.
+        Runs in the caller's transaction; returns the dates written.
+        """
+        start, end = BusinessCalendarService.horizon()
+        if dates is not None:
+            targets = {d for d in dates if start <= d <= end}
+        else:
+            days = set(weekdays) if weekdays is not None else set(range(7))
+            targets = {
+                start + timedelta(days=offset)
+                for offset in range((end - start).days + 1)
+                if (start + timedelta(days=offset)).weekday() in days
+            }
+        if not targets:
+            return []
+
+        db.flush()
+        weekly, special = _load_hours(db)
+        cutoff = timedelta(minutes=get_settings().reservation_cutoff_minutes)
+        rows = []
+        for day in sorted(targets):
+            open_time, close_time, is_closed = (
+                special.get(day) or weekly.get(day.weekday()) or (None, None, True)
+            )
+            is_open = not is_closed and open_time is not None and close_time is not None
+            closes_at = datetime.combine(day, close_time) if is_open else None
+            rows.append({
+                "date": day,
+                "open_time": open_time,
+                "close_time": close_time,
+                "is_closed": not is_open,
+                "is_special": day in special,
+                "opens_at": datetime.combine(day, open_time) if is_open else None,
+                "closes_at": closes_at,
+                "last_seating_at": closes_at - cutoff if is_open else None,
+            })
+        _upsert_calendar_rows(db, rows)
+        return [row["date"] for row in rows]
+
+    @staticmethod
+    def find_conflicts(
+        db: Session, dates: Iterable[date], weekdays: Iterable[int] = ()
+    ) -> list[HoursConflict]:
+        """
+        Active reservations still ahead of us on ``dates`` (and, past the
+        horizon, on every date of ``weekdays``) that start outside their
+        day's bookable window. Dates inside the horizon are checked with a
+        join against the calendar, so refresh them first; later bookings
+        have no calendar rows and are checked against the hours directly.
+        Either way it is one reservations query.
+        """
+        dates, weekdays = set(dates), set(weekdays)
+        if not dates and not weekdays:
+            return []
+        start, end = BusinessCalendarService.horizon()
+        calendar_dates = [d for d in dates if start <= d <= end]
+        if weekdays:
+            beyond_horizon = Reservation.reservation_date > end
+        else:
+            beyond_horizon = Reservation.reservation_date.in_([d for d in dates if d > end])
+        rows = (
+            db.query(Reservation, BusinessCalendarDay)
+            .outerjoin(
+                BusinessCalendarDay, BusinessCalendarDay.date == Reservation.reservation_date
+            )
+            .filter(
+                Reservation.status.in_(ACTIVE_STATUSES),
+                Reservation.starts_at >= datetime.now(),
+                or_(
+                    and_(
+                        BusinessCalendarDay.date.in_(calendar_dates),
+                        or_(
+                            BusinessCalendarDay.is_closed == True,
+                            Reservation.starts_at < BusinessCalendarDay.opens_at,
+                            Reservation.starts_at > BusinessCalendarDay.last_seating_at,
+                        ),
+                    ),
+                    beyond_horizon,
+                ),
+            )
+            .order_by(Reservation.starts_at, Reservation.id)
+            .all()
+        )
+
+        later_hours = None
+        conflicts = []
+        for reservation, day in rows:
+            reservation_date = reservation.reservation_date
+            if reservation_date > end:
+                if reservation_date not in dates and reservation_date.weekday() not in weekdays:
+                    continue
+                if later_hours is None:
+                    db.flush()
+                    later_hours = _load_hours(db)
+                weekly, special = later_hours
+                hours = (
+                    special.get(reservation_date)
+                    or weekly.get(reservation_date.weekday())
+                    or (None, None, True)
+                )
+                valid, reason = HoursValidationService.check_time_against_hours(
+                    reservation_date, reservation.reservation_time, hours
+                )
+                if valid:
+                    continue
+            else:
+                _, reason = HoursValidationService.check_time_against_hours(
+                    reservation_date,
+                    reservation.reservation_time,
+                    (day.open_time, day.close_time, day.is_closed),
+                )
+            conflicts.append(HoursConflict(
+                reservation_id=reservation.id,
+                guest_name=reservation.guest_name,
+                party_size=reservation.party_size,
+                reservation_date=reservation_date,
+                reservation_time=reservation.reservation_time,
+                reason=reason or "Outside operating hours",
+            ))
+        return conflicts
+
+    @staticmethod
+    def fill_horizon(db: Session) -> int:
+        """Materialise any dates missing from the horizon (e.g. as it rolls forward)."""
+        # Queue behind any hours write (which bumps the same row) so the rows
+        # written here come from committed hours, never from a stale read
+        ChangeCounter.lock(db, "hours")
+        start, end = BusinessCalendarService.horizon()
+        existing = {
+            d for (d,) in db.query(BusinessCalendarDay.date).filter(
+                BusinessCalendarDay.date.between(start, end)
+            )
+        }
+        missing = [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days + 1)
+            if start + timedelta(days=offset) not in existing
+        ]
+        written = BusinessCalendarService.refresh(db, dates=missing)
         db.commit()
+        return len(written)
+
+    @staticmethod
+    def get_calendar(
+        db: Session, start_date: date, end_date: date, open_only: bool = False
+    ) -> list[BusinessCalendarDay]:
+        """
+        Calendar rows for an inclusive range in one indexed scan. Gaps inside
+        the horizon are filled first; dates beyond it are not materialised.
+        """
+        def scan() -> list[BusinessCalendarDay]:
+            return (
+                db.query(BusinessCalendarDay)
+                .filter(BusinessCalendarDay.date.between(start_date, end_date))
+                .order_by(BusinessCalendarDay.date)
+                .all()
+            )
+
+        days = scan()
+        horizon_start, horizon_end = BusinessCalendarService.horizon()
+        first, last = max(start_date, horizon_start), min(end_date, horizon_end)
+        if first <= last:
+            covered = sum(1 for day in days if first <= day.date <= last)
+            if covered < (last - first).days + 1:
+                BusinessCalendarService.fill_horizon(db)
+                days = scan()
+        if open_only:
+            days = [day for day in days if not day.is_closed]
+        return days
 
 
 class HoursValidationService:
@@ -203,19 +659,28 @@ class HoursValidationService:
         Returns (open_time, close_time, is_closed).
         Special hours override regular hours.
         """
-        # Check for special hours first
-        special = SpecialHoursService.get_special_hours_for_date(db, target_date)
-        if special:
-            return special.open_time, special.close_time, special.is_closed
+        return HoursValidationService.get_hours_for_range(db, target_date, target_date)[
+            target_date
+        ]
 
-        # Fall back to regular operating hours
-        day_of_week = target_date.weekday()
-        regular = OperatingHoursService.get_hours_for_day(db, day_of_week)
-        if regular:
-            return regular.open_time, regular.close_time, regular.is_closed
+    @staticmethod
+    def get_hours_for_range(
+        db: Session, start_date: date, end_date: date
+    ) -> dict[date, tuple[time | None, time | None, bool]]:
+        """
+        Resolve the operating calendar for an inclusive date range.
 
-        # No hours defined - treat as closed
-        return None, None, True
+        Maps every date to (open_time, close_time, is_closed) from the cached
+        hours snapshot: special hours override the weekly row, and a date with
+        neither is closed. In the steady state this runs no queries at all.
+        """
+        snapshot = get_hours_snapshot(db)
+        hours_by_date = {}
+        day = start_date
+        while day <= end_date:
+            hours_by_date[day] = snapshot.resolve(day)
+            day += timedelta(days=1)
+        return hours_by_date
 
     @staticmethod
     def is_time_within_hours(
@@ -228,11 +693,21 @@ class HoursValidationService:
         Check if a reservation time is valid.
         Returns (is_valid, error_message).
         """
-        settings = get_settings()
-        open_time, close_time, is_closed = HoursValidationService.get_hours_for_date(
-            db, target_date
+        hours = HoursValidationService.get_hours_for_date(db, target_date)
+        return HoursValidationService.check_time_against_hours(
+            target_date, target_time, hours
         )
 
+    @staticmethod
+    def check_time_against_hours(
+        target_date: date,
+        target_time: time,
+        hours: tuple[time | None, time | None, bool],
+    ) -> tuple[bool, str | None]:
+        """Same checks as is_time_within_hours against already-loaded hours."""
+        settings = get_settings()
+        open_time, close_time, is_closed = hours
+
         if is_closed:
             return False, "Restaurant is closed on this date"
 
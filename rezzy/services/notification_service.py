@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import text
+
+from rezzy.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7999
+
+
+class Subscription:
+    """One /events/stream connection: a bounded queue fed from any thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.loop = loop
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_pending)
+
+    def offer(self, event: dict) -> None:
+        # A client that falls this far behind has to refetch anyway, so
+        # replace its backlog with a single resync marker.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "data": {}})
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class EventHub:
+    """In-process pub/sub for committed reservation and table changes."""
+
+    def __init__(self, max_pending: int = 256):
+        self.max_pending = max_pending
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.fanout: PostgresFanout | None = None
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        if self.fanout is not None:
+            self.fanout.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def deliver(self, event: dict) -> None:
+        """Hand an event to every local subscriber (safe from any thread)."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Event loop already closed; the stream is gone
+                self.unsubscribe(subscription)
+
+    def publish(self, event: dict) -> None:
+        if self.fanout is not None:
+            # Delivered back to this worker too, via its own LISTEN
+            self.fanout.notify(event)
+        else:
+            self.deliver(event)
+
+
+class PostgresFanout:
+    """Relay events between workers through PostgreSQL LISTEN/NOTIFY."""
+
+    def __init__(self, hub: EventHub, engine, channel: str):
+        self.hub = hub
+        self.engine = engine
+        self.channel = channel
+        self._thread: threading.Thread | None = None
+        self._sender: threading.Thread | None = None
+        self._outbox: queue.Queue[str] = queue.Queue()
+        self._lock = threading.Lock()
+
+    def notify(self, event: dict) -> None:
+        """Queue an event for NOTIFY; the request thread never waits on it."""
+        payload = json.dumps(event, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_BYTES:
+            logger.warning("Event %s too large to NOTIFY; sending resync", event["type"])
+            payload = json.dumps({"type": "resync", "data": {}})
+        with self._lock:
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._send, daemon=True)
+                self._sender.start()
+        self._outbox.put(payload)
+
+    def _send(self) -> None:
+        while True:
+            payload = self._outbox.get()
+            try:
+                with self.engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": self.channel, "payload": payload},
+                    )
+                    conn.commit()
+            except Exception:
+                # Listeners miss this event; the change itself is committed
+                logger.exception("Failed to NOTIFY %s", self.channel)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, daemon=True)
+                self._thread.start()
+
+    def _listen(self) -> None:
+        while True:
+            raw = None
+            try:
+                raw = self.engine.raw_connection()
+                # Autocommit and LISTEN must never leak back into the pool:
+                # this connection is ours alone and is really closed below.
+                raw.detach()
+                conn = raw.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                while True:
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._deliver(conn.notifies.pop(0).payload)
+            except Exception:
+                # Dropped connection or restart: back off, then listen again
+                logger.exception("Lost LISTEN connection on %s; reconnecting", self.channel)
+                time.sleep(1.0)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+    def _deliver(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            # Someone else's NOTIFY on our channel; skip it, keep listening
+            logger.warning("Ignoring malformed event on %s: %.200s", self.channel, payload)
+            return
+        self.hub.deliver(event)
+
+
+_hub: EventHub | None = None
+_hub_lock = threading.Lock()
+
+
+def get_event_hub() -> EventHub:
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            settings = get_settings()
+            _hub = EventHub(settings.event_stream_max_pending)
+            if settings.event_notify_channel:
+                from rezzy.core.database import engine
+
+                _hub.fanout = PostgresFanout(_hub, engine, settings.event_notify_channel)
+        return _hub
+
+
+def publish_event(event_type: str, **data: Any) -> None:
+    """
+    Broadcast a change that has just been committed. Best-effort: the write
+    already succeeded, so a delivery failure is logged, never raised.
+    """
+    try:
+        get_event_hub().publish({"type": event_type, "data": data})
+    except Exception:
+        logger.exception("Failed to publish %s event", event_type)
+
+
+def format_sse(event: dict) -> str:
+    payload = json.dumps(event["data"], default=str)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
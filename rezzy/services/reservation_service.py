@@ -1,16 +1,92 @@
+import csv
+import heapq
+import io
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Iterable, Iterator
 from datetime import date, time, datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from time import perf_counter
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, bindparam, delete, insert, inspect, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from itertools import combinations
 
-from rezzy.models import Reservation, Table
+from rezzy.models import (
+    ArchivedReservation,
+    Reservation,
+    Table,
+    reservation_tables,
+    reservation_tables_archive,
+)
 from rezzy.models.user import User
-from rezzy.schemas import ReservationCreate, ReservationUpdate
+from rezzy.schemas import (
+    ReservationCreate,
+    ReservationUpdate,
+    ReservationChanges,
+    ReservationBatch,
+    ReservationBatchUpdate,
+    ReservationBatchItemResult,
+    ReservationBatchResult,
+    ReservationResponse,
+    AvailabilityGrid,
+    AvailabilityGridSlot,
+    SeatingMove,
+    SeatingPlan,
+)
+from rezzy.core.config import get_settings
+from rezzy.services.availability_service import (
+    ACTIVE_STATUSES,
+    DayAvailability,
+    SeatingBooking,
+    TableAdjacency,
+    find_table_combinations,
+    free_block_score,
+    get_availability_cache,
+    get_day_availability,
+    load_range_availability,
+    optimize_seating,
+    rank_seating_options,
+    record_reservation,
+)
 from rezzy.services.hours_service import HoursValidationService
+from rezzy.services.notification_service import publish_event
 from rezzy.services.restaurant_service import TableService
 
 
+# SQLSTATE raised when a PostgreSQL exclusion constraint rejects a row
+EXCLUSION_VIOLATION = "23P01"
+
+# Columns of /reservations/export, in CSV order; the last two come from joins
+EXPORT_FIELDS = (
+    "id",
+    "guest_name",
+    "party_size",
+    "phone_number",
+    "notes",
+    "reservation_date",
+    "reservation_time",
+    "duration_minutes",
+    "status",
+    "table_numbers",
+    "created_by_username",
+)
+
+# Fields GET /reservations can project onto instead of full response objects
+PROJECTABLE_FIELDS = frozenset({
+    "id",
+    "guest_name",
+    "party_size",
+    "phone_number",
+    "notes",
+    "reservation_date",
+    "reservation_time",
+    "duration_minutes",
+    "status",
+    "created_by_user_id",
+    "table_ids",
+})
+
+
 class ReservationService:
     @staticmethod
     def _check_reservation_starts_in_future(
@@ -24,6 +100,53 @@ class ReservationService:
                 detail="Reservations must be for a future date and time",
             )
 
+    @staticmethod
+    def encode_cursor(reservation_date: date, reservation_time: time, reservation_id: int) -> str:
+        """Opaque keyset cursor pointing just past the given reservation."""
+        key = f"{reservation_date.isoformat()}|{reservation_time.isoformat()}|{reservation_id}"
+        return urlsafe_b64encode(key.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[date, time, int]:
+        try:
+            day, at, reservation_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return date.fromisoformat(day), time.fromisoformat(at), int(reservation_id)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    @staticmethod
+    def _filter_reservations(
+        query,
+        start_date: date | None,
+        end_date: date | None,
+        status_filter: str | None,
+        table_id: int | None,
+        limit: int | None,
+        cursor: str | None,
+        model: type[Reservation] | type[ArchivedReservation] = Reservation,
+    ):
+        if start_date:
+            query = query.filter(model.reservation_date >= start_date)
+        if end_date:
+            query = query.filter(model.reservation_date <= end_date)
+        if status_filter:
+            query = query.filter(model.status == status_filter)
+        if table_id:
+            query = query.filter(model.tables.any(Table.id == table_id))
+        if cursor:
+            query = query.filter(
+                tuple_(model.reservation_date, model.reservation_time, model.id)
+                > tuple_(*ReservationService.decode_cursor(cursor))
+            )
+
+        query = query.order_by(model.reservation_date, model.reservation_time, model.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
     @staticmethod
     def get_reservations(
         db: Session,
@@ -31,25 +154,282 @@ class ReservationService:
         end_date: date | None = None,
         status_filter: str | None = None,
         table_id: int | None = None,
-    ) -> list[Reservation]:
-        query = db.query(Reservation)
+        limit: int | None = None,
+        cursor: str | None = None,
+        include_archived: bool = False,
+    ) -> list[Reservation | ArchivedReservation]:
+        models = [Reservation, ArchivedReservation] if include_archived else [Reservation]
+        found = []
+        for model in models:
+            query = db.query(model).options(
+                selectinload(model.tables),
+                selectinload(model.created_by),
+            )
+            found += ReservationService._filter_reservations(
+                query, start_date, end_date, status_filter, table_id, limit, cursor, model
+            ).all()
 
-        if start_date:
-            query = query.filter(Reservation.reservation_date >= start_date)
-        if end_date:
-            query = query.filter(Reservation.reservation_date <= end_date)
-        if status_filter:
-            query = query.filter(Reservation.status == status_filter)
-        if table_id:
-            query = query.filter(Reservation.tables.any(Table.id == table_id))
+        if include_archived:
+            # Archived ids are the original ones, so the keyset order still holds
+            found.sort(key=lambda r: (r.reservation_date, r.reservation_time, r.id))
+            if limit is not None:
+                found = found[:limit]
+        return found
+
+    @staticmethod
+    def archive_reservations(db: Session, before: date, batch_size: int = 1000) -> int:
+        """
+        Move reservations dated before ``before`` into the archive tables.
+
+        Rows move in id-ordered batches, each in its own transaction, so a
+        long run never holds one huge transaction open. Returns the number
+        of reservations moved.
+        """
+        if before > date.today():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only past reservations can be archived",
+            )
+
+        columns = [c.name for c in ArchivedReservation.__table__.columns]
+        moved = 0
+        while True:
+            ids = db.execute(
+                select(Reservation.id)
+                .where(Reservation.reservation_date < before)
+                .order_by(Reservation.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            db.execute(
+                insert(ArchivedReservation.__table__).from_select(
+                    columns,
+                    select(*[Reservation.__table__.c[name] for name in columns])
+                    .where(Reservation.id.in_(ids)),
+                )
+            )
+            db.execute(
+                insert(reservation_tables_archive).from_select(
+                    ["reservation_id", "table_id"],
+                    select(reservation_tables.c.reservation_id, reservation_tables.c.table_id)
+                    .where(reservation_tables.c.reservation_id.in_(ids)),
+                )
+            )
+            db.execute(
+                delete(reservation_tables).where(reservation_tables.c.reservation_id.in_(ids))
+            )
+            db.execute(delete(Reservation.__table__).where(Reservation.id.in_(ids)))
+            db.commit()
+            moved += len(ids)
+        return moved
+
+    @staticmethod
+    def get_reservation_fields(
+        db: Session,
+        fields: list[str],
+        start_date: date | None = None,
+        end_date: date | None = None,
+        status_filter: str | None = None,
+        table_id: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+        include_archived: bool = False,
+    ) -> tuple[list[dict], str | None]:
+        """Project reservations onto ``fields`` without loading full objects.
+
+        Returns the rows (each always carrying ``id``) and the cursor for the
+        next page, or None when this page is the last.
+        """
+        unknown = set(fields) - PROJECTABLE_FIELDS
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+
+        sources = [(Reservation, reservation_tables)]
+        if include_archived:
+            sources.append((ArchivedReservation, reservation_tables_archive))
+
+        rows = []
+        table_ids: dict[int, list[int]] = {}
+        for model, links_table in sources:
+            columns = [
+                getattr(model, name)
+                for name in dict.fromkeys(["id", "reservation_date", "reservation_time", *fields])
+                if name != "table_ids"
+            ]
+            query = db.query(*columns)
+            found = ReservationService._filter_reservations(
+                query, start_date, end_date, status_filter, table_id, limit, cursor, model
+            ).all()
+            rows += found
+
+            found_ids = {row.id: [] for row in found}
+            if "table_ids" in fields and found:
+                links = db.execute(
+                    select(links_table.c.reservation_id, links_table.c.table_id)
+                    .where(links_table.c.reservation_id.in_(found_ids))
+                    .order_by(links_table.c.table_id)
+                )
+                for reservation_id, linked_table_id in links:
+                    found_ids[reservation_id].append(linked_table_id)
+            table_ids.update(found_ids)
+
+        if include_archived:
+            # Archived ids are the original ones, so the keyset order still holds
+            rows.sort(key=lambda r: (r.reservation_date, r.reservation_time, r.id))
+            if limit is not None:
+                rows = rows[:limit]
 
-        return query.order_by(
-            Reservation.reservation_date, Reservation.reservation_time
-        ).all()
+        items = []
+        for row in rows:
+            values = row._asdict()
+            item = {"id": row.id}
+            for name in fields:
+                item[name] = table_ids[row.id] if name == "table_ids" else values[name]
+            items.append(item)
+
+        next_cursor = None
+        if limit is not None and len(rows) == limit:
+            last = rows[-1]
+            next_cursor = ReservationService.encode_cursor(
+                last.reservation_date, last.reservation_time, last.id
+            )
+        return items, next_cursor
 
     @staticmethod
-    def get_reservation(db: Session, reservation_id: int) -> Reservation:
+    def get_changes(db: Session, since: int = 0, limit: int = 500) -> ReservationChanges:
+        """
+        Reservations written after change sequence ``since``, oldest first.
+
+        Cancelled reservations are included so clients can drop them; pass
+        the returned cursor as ``since`` on the next poll.
+        """
+        changed = (
+            db.query(Reservation)
+            .options(
+                selectinload(Reservation.tables),
+                selectinload(Reservation.created_by),
+            )
+            .filter(Reservation.change_seq > since)
+            .order_by(Reservation.change_seq)
+            .limit(limit)
+            .all()
+        )
+        return ReservationChanges(
+            cursor=changed[-1].change_seq if changed else since,
+            has_more=len(changed) == limit,
+            changes=changed,
+        )
+
+    @staticmethod
+    def export_reservations(
+        db: Session,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        status_filter: str | None = None,
+        table_id: int | None = None,
+        batch_size: int = 500,
+        include_archived: bool = False,
+    ) -> Iterator[dict]:
+        """Yield flat export rows one reservation at a time.
+
+        Creators and table numbers come from outer joins in the same
+        statement, which is streamed in ``batch_size`` chunks from a
+        server-side cursor; one reservation spans consecutive rows (one per
+        table), so they are folded together as they arrive.
+
+        Archived reservations are left out unless ``include_archived`` is
+        set, in which case the archive is streamed alongside and merged in.
+        """
+        sources = [(Reservation, reservation_tables)]
+        if include_archived:
+            sources.append((ArchivedReservation, reservation_tables_archive))
+        streams = [
+            ReservationService._export_rows(
+                db, model, links_table, start_date, end_date, status_filter, table_id, batch_size
+            )
+            for model, links_table in sources
+        ]
+        if len(streams) == 1:
+            yield from streams[0]
+            return
+        # Archived ids are the original ones, so the keyset order still holds
+        yield from heapq.merge(
+            *streams, key=lambda r: (r["reservation_date"], r["reservation_time"], r["id"])
+        )
+
+    @staticmethod
+    def _export_rows(
+        db: Session,
+        model: type[Reservation] | type[ArchivedReservation],
+        links_table,
+        start_date: date | None,
+        end_date: date | None,
+        status_filter: str | None,
+        table_id: int | None,
+        batch_size: int,
+    ) -> Iterator[dict]:
+        columns = [getattr(model, name) for name in EXPORT_FIELDS[:-2]]
+        query = (
+            db.query(
+                *columns,
+                User.username.label("created_by_username"),
+                Table.table_number,
+            )
+            .outerjoin(User, User.id == model.created_by_user_id)
+            .outerjoin(links_table, links_table.c.reservation_id == model.id)
+            .outerjoin(Table, Table.id == links_table.c.table_id)
+        )
+        query = ReservationService._filter_reservations(
+            query, start_date, end_date, status_filter, table_id, None, None, model
+        ).order_by(Table.table_number)
+
+        current = None
+        for row in query.yield_per(batch_size):
+            if current is None or current["id"] != row.id:
+                if current is not None:
+                    yield current
+                current = {name: getattr(row, name) for name in EXPORT_FIELDS[:-2]}
+                current["table_numbers"] = []
+                current["created_by_username"] = row.created_by_username
+            if row.table_number is not None:
+                current["table_numbers"].append(row.table_number)
+        if current is not None:
+            yield current
+
+    @staticmethod
+    def format_export(rows: Iterable[dict], export_format: str) -> Iterator[str]:
+        """Render export rows as NDJSON lines or CSV (with a header row)."""
+        if export_format == "ndjson":
+            for row in rows:
+                yield json.dumps(row, default=str) + "\n"
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([
+                " ".join(row[name]) if name == "table_numbers" else row[name]
+                for name in EXPORT_FIELDS
+            ])
+        yield buffer.getvalue()
+
+    @staticmethod
+    def get_reservation(
+        db: Session, reservation_id: int, include_archived: bool = False
+    ) -> Reservation | ArchivedReservation:
         reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+        if not reservation and include_archived:
+            # Archived rows are read-only, so only lookups opt into them
+            reservation = db.get(ArchivedReservation, reservation_id)
         if not reservation:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -75,19 +455,15 @@ class ReservationService:
             .filter(
                 Reservation.reservation_date == reservation_date,
                 Reservation.status.in_(["confirmed", "seated"]),
+                Reservation.starts_at < end_dt,
+                Reservation.ends_at > start_dt,
                 Reservation.tables.any(Table.id.in_(table_ids)),
             )
+            .order_by(Reservation.starts_at)
         )
         if exclude_reservation_id:
             query = query.filter(Reservation.id != exclude_reservation_id)
-
-        conflicts = []
-        for res in query.all():
-            res_start = datetime.combine(res.reservation_date, res.reservation_time)
-            res_end = res_start + timedelta(minutes=res.duration_minutes)
-            if start_dt < res_end and end_dt > res_start:
-                conflicts.append(res)
-        return conflicts
+        return query.all()
 
     @staticmethod
     def _check_tables_available(
@@ -107,6 +483,91 @@ class ReservationService:
             return False, f"Conflicts with existing reservation for {c.guest_name} at {c.reservation_time}"
         return True, None
 
+    @staticmethod
+    def _lock_tables_for_booking(db: Session, table_ids: list[int]) -> None:
+        """
+        Serialise concurrent bookings on databases without exclusion constraints.
+
+        SQLite allows one writer at a time, so taking the write lock before the
+        conflict check makes check-then-insert atomic. PostgreSQL relies on the
+        exclusion constraint on reservation_tables instead.
+        """
+        if db.get_bind().dialect.name == "sqlite":
+            db.execute(
+                update(Table)
+                .where(Table.id.in_(table_ids))
+                .values(is_active=Table.is_active)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def _commit_bookings(db: Session, reservations: list[Reservation]) -> None:
+        """
+        Copy each reservation's window and status onto its table links, stamp
+        it with a fresh change sequence, then commit.
+
+        On PostgreSQL an overlapping booking of the same table, even one that
+        raced past the conflict check, is rejected by the database here.
+        """
+        try:
+            db.flush()
+            db.execute(
+                reservation_tables.update()
+                .where(reservation_tables.c.reservation_id == bindparam("rid"))
+                .values(
+                    starts_at=bindparam("window_start"),
+                    ends_at=bindparam("window_end"),
+                    is_active=bindparam("active"),
+                ),
+                [
+                    {
+                        "rid": r.id,
+                        "window_start": r.starts_at,
+                        "window_end": r.ends_at,
+                        "active": r.status in ACTIVE_STATUSES,
+                    }
+                    for r in reservations
+                ],
+            )
+            # Last, so the counter row is locked only for the commit itself
+            Reservation.stamp_changes(db, [r.id for r in reservations])
+            db.commit()
+        except IntegrityError as exc:
+            db.rollback()
+            if getattr(exc.orig, "pgcode", None) == EXCLUSION_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Conflicts with an existing reservation on one of these tables",
+                )
+            raise
+
+    @staticmethod
+    def _publish(event_type: str, reservation: Reservation) -> None:
+        publish_event(
+            event_type,
+            id=reservation.id,
+            reservation_date=reservation.reservation_date,
+            reservation_time=reservation.reservation_time,
+            status=reservation.status,
+            table_ids=[t.id for t in reservation.tables],
+            change_seq=reservation.change_seq,
+        )
+
+    @staticmethod
+    def _new_reservation(reservation: ReservationCreate, created_by: User) -> Reservation:
+        db_reservation = Reservation(
+            guest_name=reservation.guest_name,
+            party_size=reservation.party_size,
+            phone_number=reservation.phone_number,
+            notes=reservation.notes,
+            reservation_date=reservation.reservation_date,
+            reservation_time=reservation.reservation_time,
+            duration_minutes=reservation.duration_minutes,
+            created_by_user_id=created_by.id,
+        )
+        db_reservation.sync_time_window()
+        return db_reservation
+
     @staticmethod
     def create_reservation(
         db: Session,
@@ -126,15 +587,7 @@ class ReservationService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
         # Validate tables exist and are active
-        tables = []
-        for tid in reservation.table_ids:
-            table = TableService.get_table(db, tid)
-            if not table.is_active:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Table {table.table_number} is not active",
-                )
-            tables.append(table)
+        tables = TableService.get_tables_by_ids(db, reservation.table_ids)
 
         # Check combined capacity
         total_capacity = sum(t.current_chairs for t in tables)
@@ -145,6 +598,7 @@ class ReservationService:
             )
 
         # Check availability
+        ReservationService._lock_tables_for_booking(db, reservation.table_ids)
         is_available, conflict = ReservationService._check_tables_available(
             db, reservation.table_ids, reservation.reservation_date,
             reservation.reservation_time, reservation.duration_minutes,
@@ -153,20 +607,13 @@ class ReservationService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=conflict)
 
         # Create reservation
-        db_reservation = Reservation(
-            guest_name=reservation.guest_name,
-            party_size=reservation.party_size,
-            phone_number=reservation.phone_number,
-            notes=reservation.notes,
-            reservation_date=reservation.reservation_date,
-            reservation_time=reservation.reservation_time,
-            duration_minutes=reservation.duration_minutes,
-            created_by_user_id=created_by.id,
-        )
+        db_reservation = ReservationService._new_reservation(reservation, created_by)
         db_reservation.tables = tables
         db.add(db_reservation)
-        db.commit()
+        ReservationService._commit_bookings(db, [db_reservation])
         db.refresh(db_reservation)
+        record_reservation(db_reservation)
+        ReservationService._publish("reservation.created", db_reservation)
         return db_reservation
 
     @staticmethod
@@ -174,6 +621,7 @@ class ReservationService:
         db: Session, reservation_id: int, reservation: ReservationUpdate
     ) -> Reservation:
         db_reservation = ReservationService.get_reservation(db, reservation_id)
+        previous_date = db_reservation.reservation_date
         update_data = reservation.model_dump(exclude_unset=True)
 
         new_date = update_data.get("reservation_date", db_reservation.reservation_date)
@@ -191,15 +639,7 @@ class ReservationService:
         # Handle table reassignment
         new_table_ids = update_data.pop("table_ids", None)
         if new_table_ids is not None:
-            tables = []
-            for tid in new_table_ids:
-                table = TableService.get_table(db, tid)
-                if not table.is_active:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Table {table.table_number} is not active",
-                    )
-                tables.append(table)
+            tables = TableService.get_tables_by_ids(db, new_table_ids)
             db_reservation.tables = tables
         else:
             tables = db_reservation.tables
@@ -236,6 +676,7 @@ class ReservationService:
             or "duration_minutes" in update_data
             or new_table_ids is not None
         ):
+            ReservationService._lock_tables_for_booking(db, check_ids)
             is_available, conflict = ReservationService._check_tables_available(
                 db, check_ids, new_date, new_time, new_duration,
                 exclude_reservation_id=reservation_id,
@@ -245,8 +686,11 @@ class ReservationService:
 
         for field, value in update_data.items():
             setattr(db_reservation, field, value)
-        db.commit()
+        db_reservation.sync_time_window()
+        ReservationService._commit_bookings(db, [db_reservation])
         db.refresh(db_reservation)
+        record_reservation(db_reservation, previous_date)
+        ReservationService._publish("reservation.updated", db_reservation)
         return db_reservation
 
     @staticmethod
@@ -258,10 +702,228 @@ class ReservationService:
                 detail=f"Cannot cancel a {db_reservation.status} reservation",
             )
         db_reservation.status = "cancelled"
-        db.commit()
+        ReservationService._commit_bookings(db, [db_reservation])
         db.refresh(db_reservation)
+        record_reservation(db_reservation)
+        ReservationService._publish("reservation.cancelled", db_reservation)
         return db_reservation
 
+    @staticmethod
+    def _check_batch_capacity(party_size: int, tables: list[Table]) -> None:
+        total_capacity = sum(t.current_chairs for t in tables)
+        if party_size > total_capacity:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Party size ({party_size}) exceeds combined table capacity ({total_capacity})",
+            )
+
+    @staticmethod
+    def _check_batch_slot(
+        day: DayAvailability,
+        tables: list[Table],
+        starts_at: datetime,
+        ends_at: datetime,
+        exclude_reservation_id: int | None = None,
+    ) -> None:
+        for table in tables:
+            if not day.is_table_free(table.id, starts_at, ends_at, exclude_reservation_id):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Conflicts with another reservation on table {table.table_number}",
+                )
+
+    @staticmethod
+    def _check_batch_hours(
+        hours: dict[date, tuple[time | None, time | None, bool]],
+        target_date: date,
+        target_time: time,
+    ) -> None:
+        is_valid, error = HoursValidationService.check_time_against_hours(
+            target_date, target_time, hours[target_date]
+        )
+        if not is_valid:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+    @staticmethod
+    def _stage_batch_create(
+        item: ReservationCreate,
+        created_by: User,
+        placeholder_id: int,
+        tables_by_id: dict[int, Table],
+        hours: dict[date, tuple[time | None, time | None, bool]],
+        days: dict[date, DayAvailability],
+    ) -> Reservation:
+        ReservationService._check_reservation_starts_in_future(
+            item.reservation_date, item.reservation_time
+        )
+        ReservationService._check_batch_hours(hours, item.reservation_date, item.reservation_time)
+        tables = TableService.resolve_tables(tables_by_id, item.table_ids)
+        ReservationService._check_batch_capacity(item.party_size, tables)
+
+        db_reservation = ReservationService._new_reservation(item, created_by)
+        day = days[item.reservation_date]
+        ReservationService._check_batch_slot(
+            day, tables, db_reservation.starts_at, db_reservation.ends_at
+        )
+        day.add(placeholder_id, item.table_ids, db_reservation.starts_at, db_reservation.ends_at)
+        db_reservation.tables = tables
+        return db_reservation
+
+    @staticmethod
+    def _stage_batch_update(
+        item: ReservationBatchUpdate,
+        existing: dict[int, Reservation],
+        tables_by_id: dict[int, Table],
+        hours: dict[date, tuple[time | None, time | None, bool]],
+        days: dict[date, DayAvailability],
+    ) -> tuple[Reservation, date]:
+        """Validate one update like update_reservation, applying it only if it passes."""
+        db_reservation = existing.get(item.id)
+        if db_reservation is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Reservation {item.id} not found",
+            )
+        update_data = item.model_dump(exclude_unset=True, exclude={"id"})
+
+        new_date = update_data.get("reservation_date", db_reservation.reservation_date)
+        new_time = update_data.get("reservation_time", db_reservation.reservation_time)
+        new_duration = update_data.get("duration_minutes", db_reservation.duration_minutes)
+        new_party_size = update_data.get("party_size", db_reservation.party_size)
+        new_phone = update_data.get("phone_number", db_reservation.phone_number)
+        new_status = update_data.get("status", db_reservation.status)
+
+        if new_party_size >= 4 and not new_phone:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Phone number is required for party size of 4 or more",
+            )
+
+        new_table_ids = update_data.pop("table_ids", None)
+        if new_table_ids is not None:
+            tables = TableService.resolve_tables(tables_by_id, new_table_ids)
+        else:
+            tables = list(db_reservation.tables)
+
+        window_changed = any(
+            name in update_data
+            for name in ("reservation_date", "reservation_time", "duration_minutes")
+        )
+        if window_changed:
+            if "reservation_date" in update_data or "reservation_time" in update_data:
+                ReservationService._check_reservation_starts_in_future(new_date, new_time)
+            ReservationService._check_batch_hours(hours, new_date, new_time)
+
+        if "party_size" in update_data or new_table_ids is not None:
+            ReservationService._check_batch_capacity(new_party_size, tables)
+
+        starts_at = datetime.combine(new_date, new_time)
+        ends_at = starts_at + timedelta(minutes=new_duration)
+        if window_changed or new_table_ids is not None:
+            ReservationService._check_batch_slot(
+                days[new_date], tables, starts_at, ends_at, db_reservation.id
+            )
+
+        previous_date = db_reservation.reservation_date
+        days[previous_date].remove(db_reservation.id)
+        if new_status in ACTIVE_STATUSES:
+            days[new_date].add(db_reservation.id, [t.id for t in tables], starts_at, ends_at)
+
+        if new_table_ids is not None:
+            db_reservation.tables = tables
+        for field, value in update_data.items():
+            setattr(db_reservation, field, value)
+        db_reservation.sync_time_window()
+        return db_reservation, previous_date
+
+    @staticmethod
+    def batch_reservations(
+        db: Session, batch: ReservationBatch, created_by: User
+    ) -> ReservationBatchResult:
+        """
+        Create and update many reservations with one validation pass and one commit.
+
+        Hours, tables, the reservations being updated and each affected date's
+        bookings are loaded once up front. Updates are applied before creates,
+        and every item is checked against the database and against the items
+        accepted before it. Failures are reported per item; with
+        ``batch.atomic`` any failure means nothing is written.
+        """
+        existing: dict[int, Reservation] = {}
+        if batch.update:
+            existing = {
+                r.id: r
+                for r in db.query(Reservation)
+                .options(selectinload(Reservation.tables))
+                .filter(Reservation.id.in_([item.id for item in batch.update]))
+            }
+
+        table_ids = {tid for item in batch.create for tid in item.table_ids}
+        table_ids |= {tid for item in batch.update for tid in item.table_ids or []}
+        table_ids |= {t.id for r in existing.values() for t in r.tables}
+        tables_by_id: dict[int, Table] = {}
+        if table_ids:
+            tables_by_id = {t.id: t for t in db.query(Table).filter(Table.id.in_(table_ids))}
+            ReservationService._lock_tables_for_booking(db, sorted(table_ids))
+
+        dates = {item.reservation_date for item in batch.create}
+        dates |= {item.reservation_date for item in batch.update if item.reservation_date}
+        dates |= {r.reservation_date for r in existing.values()}
+        hours = (
+            HoursValidationService.get_hours_for_range(db, min(dates), max(dates))
+            if dates else {}
+        )
+        days: dict[date, DayAvailability] = {}
+        for day_date in dates:
+            days.update(load_range_availability(db, day_date, day_date))
+
+        results: list[ReservationBatchItemResult] = []
+        staged: list[tuple[ReservationBatchItemResult, Reservation, date | None]] = []
+        for index, item in enumerate(batch.update):
+            result = ReservationBatchItemResult(operation="update", index=index)
+            try:
+                db_reservation, previous_date = ReservationService._stage_batch_update(
+                    item, existing, tables_by_id, hours, days
+                )
+                staged.append((result, db_reservation, previous_date))
+            except HTTPException as exc:
+                result.error = exc.detail
+            results.append(result)
+        for index, item in enumerate(batch.create):
+            result = ReservationBatchItemResult(operation="create", index=index)
+            try:
+                db_reservation = ReservationService._stage_batch_create(
+                    item, created_by, -(index + 1), tables_by_id, hours, days
+                )
+                staged.append((result, db_reservation, None))
+            except HTTPException as exc:
+                result.error = exc.detail
+            results.append(result)
+
+        failed = any(result.error for result in results)
+        if not staged or (failed and batch.atomic):
+            db.rollback()
+            return ReservationBatchResult(committed=False, results=results)
+
+        reservations = [r for _, r, _ in staged]
+        db.add_all(reservations)
+        ReservationService._commit_bookings(db, reservations)
+
+        # Reload in one go (identity keys don't trigger a per-object refresh)
+        # so the response doesn't lazy-load per reservation
+        ids = [inspect(r).identity[0] for r in reservations]
+        db.query(Reservation).options(
+            selectinload(Reservation.tables),
+            selectinload(Reservation.created_by),
+        ).filter(Reservation.id.in_(ids)).all()
+        for result, db_reservation, previous_date in staged:
+            record_reservation(db_reservation, previous_date)
+            ReservationService._publish(
+                f"reservation.{result.operation}d", db_reservation
+            )
+            result.reservation = ReservationResponse.model_validate(db_reservation)
+        return ReservationBatchResult(committed=True, results=results)
+
     @staticmethod
     def get_available_tables(
         db: Session,
@@ -280,28 +942,46 @@ class ReservationService:
             reservation_date, reservation_time
         )
 
-        is_valid, error = HoursValidationService.is_time_within_hours(
-            db, reservation_date, reservation_time, duration_minutes
-        )
-        if not is_valid:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+        def compute() -> list[dict]:
+            hours = HoursValidationService.get_hours_for_date(db, reservation_date)
+            is_valid, error = HoursValidationService.check_time_against_hours(
+                reservation_date, reservation_time, hours
+            )
+            if not is_valid:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
-        all_tables = db.query(Table).filter(Table.is_active == True).all()
+            all_tables = db.query(Table).filter(Table.is_active == True).all()
+
+            # Find which tables are free for this slot from the day's occupancy bitmaps
+            day = get_day_availability(db, reservation_date)
+            starts_at = datetime.combine(reservation_date, reservation_time)
+            ends_at = starts_at + timedelta(minutes=duration_minutes)
+            free_tables = day.free_tables(all_tables, starts_at, ends_at, exclude_reservation_id)
 
-        # Find which tables are free for this slot
-        free_tables = []
-        for table in all_tables:
-            conflicts = ReservationService._overlapping_reservations(
-                db,
-                [table.id],
-                reservation_date,
-                reservation_time,
-                duration_minutes,
-                exclude_reservation_id,
+            return ReservationService._seating_options(
+                day, free_tables, party_size, starts_at, ends_at, hours, exclude_reservation_id
             )
-            if not conflicts:
-                free_tables.append(table)
 
+        return get_availability_cache().get_or_compute(
+            reservation_date,
+            ("available", reservation_time, party_size, duration_minutes, exclude_reservation_id),
+            compute,
+        )
+
+    @staticmethod
+    def _seating_options(
+        day: DayAvailability,
+        free_tables: list[Table],
+        party_size: int,
+        starts_at: datetime,
+        ends_at: datetime,
+        hours: tuple[time | None, time | None, bool],
+        exclude_reservation_id: int | None = None,
+    ) -> list[dict]:
+        """
+        Single free tables that seat the party, or else combos of free tables,
+        ranked best fit first.
+        """
         available: list[dict] = []
 
         # Single tables that fit
@@ -316,19 +996,313 @@ class ReservationService:
 
         # Combinations of free tables that together fit the party
         # (only suggest if no single table fits, to keep the list clean)
-        if not any(o["type"] == "table" for o in available):
-            for r in range(2, len(free_tables) + 1):
-                for combo in combinations(free_tables, r):
-                    total = sum(t.current_chairs for t in combo)
-                    if total >= party_size:
-                        available.append({
-                            "type": "combo",
-                            "table_ids": [t.id for t in combo],
-                            "table_numbers": [t.table_number for t in combo],
-                            "capacity": total,
-                        })
-                # Stop after finding combos of the smallest sufficient size
-                if any(o["type"] == "combo" for o in available):
+        if not available:
+            settings = get_settings()
+            adjacency = None
+            if settings.table_join_distance is not None:
+                adjacency = TableAdjacency(free_tables, settings.table_join_distance)
+            for combo in find_table_combinations(
+                free_tables,
+                party_size,
+                settings.max_combo_suggestions,
+                settings.combo_search_budget_ms,
+                adjacency,
+            ):
+                available.append({
+                    "type": "combo",
+                    "table_ids": [t.id for t in combo],
+                    "table_numbers": [t.table_number for t in combo],
+                    "capacity": sum(t.current_chairs for t in combo),
+                })
+
+        open_time, close_time, _ = hours
+        if open_time is None or close_time is None:
+            return available
+        return rank_seating_options(
+            available,
+            day,
+            party_size,
+            starts_at,
+            ends_at,
+            datetime.combine(starts_at.date(), open_time),
+            datetime.combine(starts_at.date(), close_time),
+            get_settings().default_reservation_duration_minutes,
+            exclude_reservation_id,
+        )
+
+    @staticmethod
+    def find_next_available(
+        db: Session,
+        party_size: int,
+        preferred_date: date,
+        preferred_time: time,
+        duration_minutes: int = 90,
+        horizon_days: int = 7,
+        limit: int = 5,
+    ) -> list[dict]:
+        """
+        Find the bookable slots nearest to a preferred date and time.
+
+        Looks up to ``horizon_days`` either side of the preferred date, loading
+        hours, tables and reservations for the whole horizon up front, and
+        returns the best seating option for each of the ``limit`` nearest slots.
+        Slots whose free tables can't seat the party even when pushed together
+        are skipped without a combination search, and the whole search stops
+        at ``next_available_budget_ms`` with whatever it has found by then.
+        """
+        settings = get_settings()
+        now = datetime.now()
+        start_date = max(preferred_date - timedelta(days=horizon_days), now.date())
+        end_date = preferred_date + timedelta(days=horizon_days)
+        if end_date < start_date:
+            return []
+
+        deadline = perf_counter() + settings.next_available_budget_ms / 1000
+        hours_by_date = HoursValidationService.get_hours_for_range(db, start_date, end_date)
+        days = load_range_availability(db, start_date, end_date)
+        all_tables = db.query(Table).filter(Table.is_active == True).all()
+        adjacency = None
+        if settings.table_join_distance is not None:
+            adjacency = TableAdjacency(all_tables, settings.table_join_distance)
+
+        # Every bookable slot start in the horizon, nearest to the preference first
+        preferred = datetime.combine(preferred_date, preferred_time)
+        candidates: list[datetime] = []
+        for day, (open_time, close_time, is_closed) in hours_by_date.items():
+            if is_closed or open_time is None or close_time is None:
+                continue
+            slot_start = datetime.combine(day, open_time)
+            cutoff = datetime.combine(day, close_time) - timedelta(
+                minutes=settings.reservation_cutoff_minutes
+            )
+            while slot_start <= cutoff:
+                if slot_start > now:
+                    candidates.append(slot_start)
+                slot_start += timedelta(minutes=settings.occupancy_slot_minutes)
+        candidates.sort(key=lambda slot: (abs(slot - preferred), slot))
+
+        found: list[dict] = []
+        for slot_start in candidates:
+            if perf_counter() >= deadline:
+                break
+            day = days[slot_start.date()]
+            slot_end = slot_start + timedelta(minutes=duration_minutes)
+            free_tables = day.free_tables(all_tables, slot_start, slot_end)
+            # Same bound as the grid: the largest connected group of free tables
+            clusters = adjacency.clusters(free_tables) if adjacency else [free_tables]
+            if max((sum(t.current_chairs for t in c) for c in clusters), default=0) < party_size:
+                continue
+            options = ReservationService._seating_options(
+                day,
+                free_tables,
+                party_size,
+                slot_start,
+                slot_end,
+                hours_by_date[slot_start.date()],
+            )
+            if options:
+                found.append({
+                    "reservation_date": slot_start.date(),
+                    "reservation_time": slot_start.time(),
+                    **options[0],
+                })
+                if len(found) >= limit:
                     break
+        return found
+
+    @staticmethod
+    def get_availability_grid(
+        db: Session,
+        target_date: date,
+        duration_minutes: int = 90,
+    ) -> AvailabilityGrid:
+        """
+        Summarise availability for every bookable slot of a day.
+
+        Each slot reports the largest party one free table can seat and the
+        largest party a connected group of free tables can seat, which answers
+        every party size for that slot without a per-slot request.
+        """
+        settings = get_settings()
+        slot_minutes = settings.occupancy_slot_minutes
+        grid = AvailabilityGrid(
+            date=target_date,
+            duration_minutes=duration_minutes,
+            slot_minutes=slot_minutes,
+            is_closed=True,
+        )
+
+        open_time, close_time, is_closed = HoursValidationService.get_hours_for_date(
+            db, target_date
+        )
+        if is_closed or open_time is None or close_time is None:
+            return grid
+        grid.is_closed = False
+
+        all_tables = db.query(Table).filter(Table.is_active == True).all()
+        adjacency = None
+        if settings.table_join_distance is not None:
+            adjacency = TableAdjacency(all_tables, settings.table_join_distance)
+        day = get_day_availability(db, target_date)
+
+        slot_start = datetime.combine(target_date, open_time)
+        cutoff = datetime.combine(target_date, close_time) - timedelta(
+            minutes=settings.reservation_cutoff_minutes
+        )
+        now = datetime.now()
+        while slot_start <= cutoff:
+            if slot_start > now:
+                free_tables = day.free_tables(
+                    all_tables,
+                    slot_start,
+                    slot_start + timedelta(minutes=duration_minutes),
+                )
+                clusters = adjacency.clusters(free_tables) if adjacency else [free_tables]
+                grid.slots.append(
+                    AvailabilityGridSlot(
+                        time=slot_start.time(),
+                        max_table_capacity=max(
+                            (t.current_chairs for t in free_tables), default=0
+                        ),
+                        max_combo_capacity=max(
+                            (
+                                sum(t.current_chairs for t in cluster)
+                                for cluster in clusters
+                                if len(cluster) > 1
+                            ),
+                            default=0,
+                        ),
+                    )
+                )
+            slot_start += timedelta(minutes=slot_minutes)
+        return grid
+
+    @staticmethod
+    def _lock_planned_tables(
+        db: Session,
+        target_date: date,
+        planned_from: list[Reservation],
+        moves: list[SeatingMove],
+    ) -> None:
+        """
+        Lock every table a seating plan touches, then check that no booking on
+        those tables changed since the plan was computed from unlocked reads.
+        """
+        table_ids = sorted({
+            tid for move in moves for tid in move.from_table_ids + move.to_table_ids
+        })
+        ReservationService._lock_tables_for_booking(db, table_ids)
+
+        def bookings_on_locked_tables(reservations: list[Reservation]) -> dict:
+            return {
+                r.id: (r.status, r.starts_at, r.ends_at, sorted(t.id for t in r.tables))
+                for r in reservations
+                if r.status in ACTIVE_STATUSES
+                and any(t.id in table_ids for t in r.tables)
+            }
+
+        planned = bookings_on_locked_tables(planned_from)
+        current = (
+            db.query(Reservation)
+            .options(selectinload(Reservation.tables))
+            .filter(Reservation.reservation_date == target_date)
+            .populate_existing()
+            .all()
+        )
+        if bookings_on_locked_tables(current) != planned:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Bookings for {target_date} changed while planning; run the optimiser again",
+            )
+
+    @staticmethod
+    def optimize_seating(
+        db: Session, target_date: date, apply: bool = False
+    ) -> SeatingPlan:
+        """
+        Propose table reassignments for a day that leave the longest free blocks.
+
+        Only confirmed, single-table reservations that have not started yet are
+        moved; seated parties and combos stay where they are. With ``apply``
+        every move is written in one transaction.
+        """
+        open_time, close_time, is_closed = HoursValidationService.get_hours_for_date(
+            db, target_date
+        )
+        if is_closed or open_time is None or close_time is None:
+            return SeatingPlan(date=target_date, score_before=0, score_after=0)
+        window_start = datetime.combine(target_date, open_time)
+        window_end = datetime.combine(target_date, close_time)
+
+        tables = db.query(Table).filter(Table.is_active == True).all()
+        reservations = (
+            db.query(Reservation)
+            .options(selectinload(Reservation.tables))
+            .filter(
+                Reservation.reservation_date == target_date,
+                Reservation.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(Reservation.starts_at, Reservation.id)
+            .all()
+        )
+        now = datetime.now()
+        bookings = [
+            SeatingBooking(
+                reservation_id=r.id,
+                party_size=r.party_size,
+                starts_at=r.starts_at,
+                ends_at=r.ends_at,
+                table_ids=[t.id for t in r.tables],
+                movable=r.status == "confirmed" and r.starts_at > now,
+            )
+            for r in reservations
+        ]
+
+        def total_score(assignment: dict[int, list[int]]) -> int:
+            windows: dict[int, list[tuple[datetime, datetime]]] = {t.id: [] for t in tables}
+            for booking in bookings:
+                for table_id in assignment.get(booking.reservation_id, booking.table_ids):
+                    if table_id in windows:
+                        windows[table_id].append((booking.starts_at, booking.ends_at))
+            return sum(
+                free_block_score(t.current_chairs, windows[t.id], window_start, window_end)
+                for t in tables
+            )
+
+        new_assignment = optimize_seating(tables, bookings, window_start, window_end)
+        tables_by_id = {t.id: t for t in tables}
+        moves = [
+            SeatingMove(
+                reservation_id=r.id,
+                guest_name=r.guest_name,
+                reservation_time=r.reservation_time,
+                from_table_ids=[t.id for t in r.tables],
+                to_table_ids=new_assignment[r.id],
+            )
+            for r in reservations
+            if r.id in new_assignment
+        ]
+        plan = SeatingPlan(
+            date=target_date,
+            moves=moves,
+            score_before=total_score({}),
+            score_after=total_score(new_assignment),
+        )
 
-        return available
+        if apply and moves:
+            ReservationService._lock_planned_tables(db, target_date, reservations, moves)
+            moved = [r for r in reservations if r.id in new_assignment]
+            for r in moved:
+                r.tables = [tables_by_id[tid] for tid in new_assignment[r.id]]
+            ReservationService._commit_bookings(db, moved)
+            # Reload in one go rather than lazy-loading each moved reservation
+            ids = [inspect(r).identity[0] for r in moved]
+            db.query(Reservation).options(selectinload(Reservation.tables)).filter(
+                Reservation.id.in_(ids)
+            ).all()
+            for r in moved:
+                record_reservation(r)
+                ReservationService._publish("reservation.updated", r)
+            plan.applied = True
+        return plan
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from rezzy.models import RestaurantConfig, Table
+from rezzy.models import RestaurantConfig, Reservation, Table, reservation_tables
 from rezzy.schemas import (
     RestaurantConfigCreate,
     RestaurantConfigUpdate,
@@ -9,6 +9,8 @@ from rezzy.schemas import (
     TableUpdate,
     ChairRearrangement,
 )
+from rezzy.services.availability_service import invalidate_all_availability
+from rezzy.services.notification_service import publish_event
 
 
 class RestaurantConfigService:
@@ -64,6 +66,49 @@ class TableService:
             )
         return table
 
+    @staticmethod
+    def get_tables_by_ids(
+        db: Session, table_ids: list[int], require_active: bool = True
+    ) -> list[Table]:
+        """Load tables with one IN query, returned in the order requested."""
+        if not table_ids:
+            return []
+        tables_by_id = {
+            t.id: t for t in db.query(Table).filter(Table.id.in_(set(table_ids)))
+        }
+        return TableService.resolve_tables(tables_by_id, table_ids, require_active)
+
+    @staticmethod
+    def resolve_tables(
+        tables_by_id: dict[int, Table], table_ids: list[int], require_active: bool = True
+    ) -> list[Table]:
+        """
+        Pick ``table_ids`` out of already-loaded tables, in order.
+        Every missing (or, if required, inactive) id is reported in one error.
+        """
+        missing = [tid for tid in table_ids if tid not in tables_by_id]
+        if missing:
+            noun = "Table" if len(missing) == 1 else "Tables"
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{noun} {', '.join(map(str, missing))} not found",
+            )
+
+        tables = [tables_by_id[tid] for tid in table_ids]
+        if require_active:
+            inactive = [t.table_number for t in tables if not t.is_active]
+            if len(inactive) == 1:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Table {inactive[0]} is not active",
+                )
+            if inactive:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Tables {', '.join(inactive)} are not active",
+                )
+        return tables
+
     @staticmethod
     def create_table(db: Session, table: TableCreate) -> Table:
         existing = db.query(Table).filter(Table.table_number == table.table_number).first()
@@ -79,6 +124,8 @@ class TableService:
         db.add(db_table)
         db.commit()
         db.refresh(db_table)
+        invalidate_all_availability()
+        publish_event("table.created", id=db_table.id, table_number=db_table.table_number)
         return db_table
 
     @staticmethod
@@ -117,13 +164,26 @@ class TableService:
             setattr(db_table, field, value)
         db.commit()
         db.refresh(db_table)
+        invalidate_all_availability()
+        publish_event("table.updated", id=db_table.id, table_number=db_table.table_number)
         return db_table
 
     @staticmethod
     def delete_table(db: Session, table_id: int) -> None:
         db_table = TableService.get_table(db, table_id)
+        # Reservations lose this table's link rows; give them a new change_seq
+        # so clients syncing through /reservations/changes drop the table too
+        linked = [
+            rid for (rid,) in db.query(reservation_tables.c.reservation_id)
+            .filter(reservation_tables.c.table_id == table_id)
+            .distinct()
+        ]
         db.delete(db_table)
+        db.flush()
+        Reservation.stamp_changes(db, linked)
         db.commit()
+        invalidate_all_availability()
+        publish_event("table.deleted", id=table_id)
 
     @staticmethod
     def rearrange_chairs(
@@ -140,8 +200,10 @@ class TableService:
         total_chairs_needed = 0
         total_chairs_released = 0
 
-        for rearrangement in rearrangements:
-            table = TableService.get_table(db, rearrangement.table_id)
+        tables = TableService.get_tables_by_ids(
+            db, [r.table_id for r in rearrangements], require_active=False
+        )
+        for rearrangement, table in zip(rearrangements, tables):
             if rearrangement.new_chair_count > table.max_chairs:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -164,5 +226,15 @@ class TableService:
         for table, new_count in tables_to_update:
             table.current_chairs = new_count
         config.total_extra_chairs -= net_chairs_from_pool
+        remaining_extra_chairs = config.total_extra_chairs
         db.commit()
-        return [t[0] for t in tables_to_update]
+        invalidate_all_availability()
+        publish_event(
+            "tables.chairs_rearranged",
+            chairs={r.table_id: r.new_chair_count for r in rearrangements},
+            total_extra_chairs=remaining_extra_chairs,
+        )
+        # Reload the committed rows in one query rather than one refresh each
+        return TableService.get_tables_by_ids(
+            db, [r.table_id for r in rearrangements], require_active=False
+        )
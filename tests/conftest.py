@@ -1,6 +1,6 @@
 import pytest
 from datetime import date, time, datetime, timezone
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
@@ -8,6 +8,8 @@ from rezzy.core.database import Base, get_db
 from rezzy.core.security import get_current_user, hash_password
 from rezzy.main import app
 from rezzy.models.user import User
+from rezzy.services.availability_service import clear_availability_cache
+from rezzy.services.hours_service import clear_hours_cache
 
 
 # Use SQLite for testing
@@ -21,6 +23,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test."""
+    clear_availability_cache()
+    clear_hours_cache()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
@@ -30,6 +34,21 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def query_counter(db):
+    """Count SQL statements executed against the test engine."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
 @pytest.fixture(scope="function")
 def client(db):
     """Create a test client with database dependency override."""
@@ -0,0 +1,281 @@
+from datetime import date, datetime
+from time import perf_counter
+from types import SimpleNamespace
+
+from rezzy.services import availability_service
+from rezzy.services.availability_service import (
+    AvailabilityCache,
+    LocalCacheBackend,
+    DayAvailability,
+    TableAdjacency,
+    SeatingBooking,
+    find_table_combinations,
+    free_block_score,
+    get_availability_cache,
+    get_day_availability,
+    optimize_seating,
+    rank_seating_options,
+)
+
+
+DAY = date(2026, 7, 6)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(DAY.year, DAY.month, DAY.day, hour, minute)
+
+
+def make_tables(*capacities: int) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(id=i, table_number=f"T{i}", current_chairs=capacity)
+        for i, capacity in enumerate(capacities, start=1)
+    ]
+
+
+class TestFindTableCombinations:
+    def test_returns_smallest_sufficient_combos(self):
+        tables = make_tables(2, 8, 4, 6)
+
+        combos = find_table_combinations(tables, 9, max_results=10, time_budget_ms=50)
+
+        assert sorted(sorted(t.current_chairs for t in c) for c in combos) == [
+            [2, 8],
+            [4, 6],
+            [4, 8],
+            [6, 8],
+        ]
+
+    def test_no_combo_when_floor_is_too_small(self):
+        tables = make_tables(2, 2, 2)
+
+        assert find_table_combinations(tables, 7, max_results=10, time_budget_ms=50) == []
+
+    def test_large_party_on_many_small_tables_is_capped(self):
+        tables = make_tables(*([2] * 30))
+
+        started = perf_counter()
+        combos = find_table_combinations(tables, 14, max_results=10, time_budget_ms=50)
+        elapsed = perf_counter() - started
+
+        assert len(combos) == 10
+        assert all(len(c) == 7 for c in combos)
+        assert elapsed < 0.5
+
+
+def place(tables: list[SimpleNamespace], *positions: tuple[float, float]):
+    for table, (x, y) in zip(tables, positions):
+        table.x_position, table.y_position = x, y
+    return tables
+
+
+class TestTableAdjacency:
+    def test_links_only_tables_within_join_distance(self):
+        tables = place(make_tables(4, 4, 4), (0, 0), (90, 0), (500, 500))
+
+        adjacency = TableAdjacency(tables, join_distance=100)
+
+        assert adjacency.are_adjacent(1, 2)
+        assert not adjacency.are_adjacent(1, 3)
+        assert adjacency.neighbors[3] == set()
+
+    def test_combos_must_be_connected(self):
+        # A chain 1-2-3 in one corner and a lone table 4 across the room
+        tables = place(make_tables(4, 4, 4, 4), (0, 0), (100, 0), (200, 0), (900, 900))
+        adjacency = TableAdjacency(tables, join_distance=100)
+
+        combos = find_table_combinations(
+            tables, 8, max_results=10, time_budget_ms=50, adjacency=adjacency
+        )
+
+        assert sorted(sorted(t.id for t in c) for c in combos) == [[1, 2], [2, 3]]
+
+    def test_connected_groups_are_not_repeated(self):
+        tables = place(make_tables(*([2] * 6)), *[(0, 0)] * 6)
+        adjacency = TableAdjacency(tables, join_distance=100)
+
+        combos = find_table_combinations(
+            tables, 6, max_results=100, time_budget_ms=50, adjacency=adjacency
+        )
+
+        keys = [frozenset(t.id for t in c) for c in combos]
+        assert len(keys) == len(set(keys)) == 20
+
+
+class TestDayAvailability:
+    def test_slot_bitmap_detects_overlap(self):
+        day = DayAvailability(DAY, 15)
+        day.add(1, [10], at(18), at(19, 30))
+
+        assert day.masks[10] == day.slot_mask(at(18), at(19, 30))
+        assert not day.is_table_free(10, at(19), at(20, 30))
+        assert day.is_table_free(10, at(19, 30), at(21))
+        assert day.is_table_free(10, at(16, 30), at(18))
+        assert day.is_table_free(11, at(18), at(19))
+
+    def test_off_grid_times_use_exact_intervals(self):
+        day = DayAvailability(DAY, 15)
+        day.add(1, [10], at(18, 10), at(19, 40))
+
+        assert day.is_table_free(10, at(19, 40), at(21, 10))
+        assert not day.is_table_free(10, at(19, 35), at(21))
+
+    def test_remove_and_exclude_free_the_table(self):
+        day = DayAvailability(DAY, 15)
+        day.add(1, [10, 11], at(18), at(19, 30))
+
+        assert day.is_table_free(10, at(18), at(19), exclude_reservation_id=1)
+        day.remove(1)
+        assert day.masks[10] == day.masks[11] == 0
+
+    def test_free_tables_scans_every_table(self):
+        tables = make_tables(2, 2, 2)
+        day = DayAvailability(DAY, 15)
+        day.add(1, [2], at(18), at(19, 30))
+
+        free = day.free_tables(tables, at(18, 30), at(20))
+
+        assert [t.id for t in free] == [1, 3]
+
+
+def option(*table_ids: int, capacity: int) -> dict:
+    return {"table_ids": list(table_ids), "capacity": capacity}
+
+
+class TestRankSeatingOptions:
+    def rank(self, options, day, party_size, starts_at, ends_at):
+        return rank_seating_options(
+            options, day, party_size, starts_at, ends_at, at(11), at(22), 90
+        )
+
+    def test_fewest_wasted_seats_first(self):
+        day = DayAvailability(DAY, 15)
+        options = [option(1, capacity=8), option(2, capacity=2), option(3, capacity=4)]
+
+        ranked = self.rank(options, day, 2, at(18), at(19, 30))
+
+        assert [o["table_ids"] for o in ranked] == [[2], [3], [1]]
+
+    def test_prefers_tables_that_leave_usable_gaps(self):
+        day = DayAvailability(DAY, 15)
+        day.add(1, [1], at(19), at(20, 30))
+        options = [option(1, capacity=2), option(2, capacity=2)]
+
+        ranked = self.rank(options, day, 2, at(17), at(18, 30))
+
+        assert [o["table_ids"] for o in ranked] == [[2], [1]]
+        assert day.stranded_minutes(1, at(17), at(18, 30), at(11), at(22), 90) == 30
+
+    def test_back_to_back_booking_strands_nothing(self):
+        day = DayAvailability(DAY, 15)
+        day.add(1, [1], at(19), at(20, 30))
+
+        assert day.stranded_minutes(1, at(17, 30), at(19), at(11), at(22), 90) == 0
+
+
+def booking(rid: int, table_id: int, start: datetime, end: datetime, movable=True, party=2):
+    return SeatingBooking(rid, party, start, end, [table_id], movable)
+
+
+class TestOptimizeSeating:
+    def test_free_block_score_prefers_one_long_block(self):
+        split = free_block_score(1, [(at(15), at(16))], at(11), at(22))
+        edge = free_block_score(1, [(at(11), at(12))], at(11), at(22))
+
+        assert edge > split
+        assert free_block_score(2, [], at(11), at(22)) == 2 * 660 ** 2
+
+    def test_consolidates_bookings_onto_one_table(self):
+        tables = make_tables(4, 4)
+        bookings = [
+            booking(1, 1, at(12), at(13, 30)),
+            booking(2, 2, at(18), at(19, 30)),
+        ]
+
+        moves = optimize_seating(tables, bookings, at(11), at(22))
+
+        assert len(moves) == 1
+        ((rid, new_tables),) = moves.items()
+        assert new_tables == [1 if rid == 2 else 2]
+
+    def test_pinned_bookings_stay_and_capacity_is_respected(self):
+        tables = make_tables(2, 8)
+        bookings = [
+            booking(1, 1, at(12), at(13, 30), movable=False),
+            booking(2, 2, at(18), at(19, 30), party=6),
+        ]
+
+        assert optimize_seating(tables, bookings, at(11), at(22)) == {}
+
+    def test_small_party_moves_off_a_large_table(self):
+        tables = make_tables(2, 8)
+        bookings = [booking(1, 2, at(18), at(19, 30))]
+
+        assert optimize_seating(tables, bookings, at(11), at(22)) == {1: [1]}
+
+
+class TestLocalCacheBackend:
+    def test_evicts_least_recently_used(self):
+        backend = LocalCacheBackend(max_entries=2)
+        backend.set("a", "1", 60)
+        backend.set("b", "2", 60)
+        backend.get("a")
+        backend.set("c", "3", 60)
+
+        assert backend.get("a") == "1"
+        assert backend.get("b") is None
+        assert backend.get("c") == "3"
+
+    def test_expired_entries_are_misses(self):
+        backend = LocalCacheBackend(max_entries=2)
+        backend.set("a", "1", 0)
+        assert backend.get("a") is None
+
+    def test_invalidating_a_date_leaves_other_dates_cached(self):
+        cache = AvailabilityCache(LocalCacheBackend(max_entries=8), ttl_seconds=60)
+        other = date(2026, 7, 7)
+        cache.get_or_compute(DAY, ("18:00", 2), lambda: [1])
+        cache.get_or_compute(other, ("18:00", 2), lambda: [2])
+
+        cache.invalidate(DAY)
+        assert cache.get_or_compute(DAY, ("18:00", 2), lambda: None) is None
+        assert cache.get_or_compute(other, ("18:00", 2), lambda: None) == [2]
+
+        cache.invalidate_all()
+        assert cache.get_or_compute(other, ("18:00", 2), lambda: None) is None
+
+    def test_answer_computed_across_an_invalidation_is_not_served(self):
+        cache = AvailabilityCache(LocalCacheBackend(max_entries=8), ttl_seconds=60)
+
+        def compute_while_a_booking_commits():
+            cache.invalidate(DAY)
+            return ["stale"]
+
+        assert cache.get_or_compute(DAY, ("18:00", 2), compute_while_a_booking_commits) == ["stale"]
+        assert cache.get_or_compute(DAY, ("18:00", 2), lambda: ["fresh"]) == ["fresh"]
+
+
+class TestDayOccupancyCache:
+    def test_day_is_reused_while_its_generation_is_current(self, db):
+        first = get_day_availability(db, DAY)
+        assert get_day_availability(db, DAY) is first
+
+    def test_bump_from_another_worker_retires_the_cached_day(self, db):
+        first = get_day_availability(db, DAY)
+        # A shared backend bumps the generation without this process patching
+        get_availability_cache().backend.bump(DAY.isoformat())
+        assert get_day_availability(db, DAY) is not first
+
+    def test_load_racing_a_booking_is_not_cached(self, db, monkeypatch):
+        load = availability_service.load_day_availability
+
+        def load_while_a_booking_commits(session, reservation_date):
+            day = load(session, reservation_date)
+            get_availability_cache().invalidate(reservation_date)
+            return day
+
+        monkeypatch.setattr(
+            availability_service, "load_day_availability", load_while_a_booking_commits
+        )
+        raced = get_day_availability(db, DAY)
+        monkeypatch.setattr(availability_service, "load_day_availability", load)
+        assert get_day_availability(db, DAY) is not raced
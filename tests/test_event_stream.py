@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from datetime import date, timedelta
+
+from rezzy.services.notification_service import EventHub, format_sse, get_event_hub
+
+
+def get_next_weekday(start_date: date, weekday: int) -> date:
+    """Get the next occurrence of a weekday (0=Monday, 6=Sunday)."""
+    days_ahead = weekday - start_date.weekday()
+    if days_ahead <= 0:
+        days_ahead += 7
+    return start_date + timedelta(days=days_ahead)
+
+
+def drain(subscription) -> list[dict]:
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+class TestEventHub:
+    def test_delivers_events_published_from_other_threads(self):
+        async def scenario():
+            hub = EventHub()
+            subscription = hub.subscribe()
+            worker = threading.Thread(
+                target=hub.publish, args=({"type": "table.created", "data": {"id": 1}},)
+            )
+            worker.start()
+            worker.join()
+            return await asyncio.wait_for(subscription.get(), 1)
+
+        assert asyncio.run(scenario()) == {"type": "table.created", "data": {"id": 1}}
+
+    def test_slow_subscriber_is_told_to_resync(self):
+        async def scenario():
+            hub = EventHub(max_pending=2)
+            subscription = hub.subscribe()
+            for i in range(3):
+                hub.publish({"type": "table.updated", "data": {"id": i}})
+            await asyncio.sleep(0)
+            return drain(subscription)
+
+        assert asyncio.run(scenario()) == [{"type": "resync", "data": {}}]
+
+    def test_unsubscribed_streams_stop_receiving(self):
+        async def scenario():
+            hub = EventHub()
+            subscription = hub.subscribe()
+            hub.unsubscribe(subscription)
+            hub.publish({"type": "table.deleted", "data": {"id": 1}})
+            await asyncio.sleep(0)
+            return drain(subscription)
+
+        assert asyncio.run(scenario()) == []
+
+    def test_format_sse(self):
+        event = {"type": "reservation.cancelled", "data": {"id": 3, "date": date(2026, 7, 6)}}
+        assert format_sse(event) == (
+            'event: reservation.cancelled\ndata: {"id": 3, "date": "2026-07-06"}\n\n'
+        )
+
+
+class TestServiceEvents:
+    def test_reservation_and_table_changes_are_published(self, client, full_setup):
+        async def scenario():
+            hub = get_event_hub()
+            subscription = hub.subscribe()
+            try:
+                created = client.post(
+                    "/reservations",
+                    json={
+                        "guest_name": "Guest",
+                        "party_size": 2,
+                        "reservation_date": get_next_weekday(date.today(), 0).isoformat(),
+                        "reservation_time": "18:00:00",
+                        "table_ids": [full_setup["table"]["id"]],
+                    },
+                ).json()
+                client.post(f"/reservations/{created['id']}/cancel")
+                client.patch(f"/tables/{full_setup['table']['id']}", json={"max_chairs": 8})
+                await asyncio.sleep(0)
+                return created, drain(subscription)
+            finally:
+                hub.unsubscribe(subscription)
+
+        created, events = asyncio.run(scenario())
+        assert [e["type"] for e in events] == [
+            "reservation.created",
+            "reservation.cancelled",
+            "table.updated",
+        ]
+        assert events[0]["data"]["id"] == created["id"]
+        assert events[0]["data"]["table_ids"] == [full_setup["table"]["id"]]
+        assert events[1]["data"]["status"] == "cancelled"
+
+
+class TestBestEffortPublishing:
+    def test_publish_failure_does_not_fail_the_write(self, client, full_setup, monkeypatch):
+        def broken_publish(event):
+            raise RuntimeError("NOTIFY failed")
+
+        monkeypatch.setattr(get_event_hub(), "publish", broken_publish)
+        response = client.patch(f"/tables/{full_setup['table']['id']}", json={"max_chairs": 8})
+        assert response.status_code == 200
+
+    def test_oversized_notify_payload_becomes_resync(self):
+        from rezzy.services.notification_service import PostgresFanout
+
+        fanout = PostgresFanout(EventHub(), engine=None, channel="rezzy")
+        fanout._sender = threading.current_thread()  # keep the sender thread off
+        fanout.notify({"type": "table.updated", "data": {"note": "x" * 10_000}})
+        fanout.notify({"type": "table.updated", "data": {"id": 1}})
+        assert [fanout._outbox.get_nowait() for _ in range(2)] == [
+            '{"type": "resync", "data": {}}',
+            '{"type": "table.updated", "data": {"id": 1}}',
+        ]
+
+    def test_malformed_notify_payload_is_skipped(self):
+        from rezzy.services.notification_service import PostgresFanout
+
+        hub = EventHub()
+        delivered = []
+        hub.deliver = delivered.append
+        fanout = PostgresFanout(hub, engine=None, channel="rezzy")
+        fanout._deliver("not json")
+        fanout._deliver('{"type": "table.updated", "data": {"id": 1}}')
+        assert delivered == [{"type": "table.updated", "data": {"id": 1}}]
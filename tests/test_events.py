@@ -95,6 +95,27 @@ class TestDailyEventsContext:
         # Events are fetched once for the whole range, not per day.
         assert fetch_calls["events"] == 1
 
+    def test_weekly_context_resolves_hours_once_for_the_range(
+        self, client, full_setup, monkeypatch, query_counter
+    ):
+        monkeypatch.setattr(events_service, "fetch_enmarket_events", lambda: [])
+        monkeypatch.setattr(events_service, "fetch_savannah_civic_events", lambda: [])
+        client.post("/hours/special", json={"date": "2026-07-04", "is_closed": True})
+        # Warm the hours cache so both requests are measured in steady state
+        client.get("/events/daily-context?date=2026-07-02")
+
+        query_counter.clear()
+        client.get("/events/daily-context?date=2026-07-03")
+        single_day = len(query_counter)
+
+        query_counter.clear()
+        response = client.get("/events/weekly-context?start=2026-07-01&end=2026-07-07")
+        assert response.status_code == 200
+        assert [day["is_closed"] for day in response.json()] == [
+            False, False, False, True, False, False, False,
+        ]
+        assert len(query_counter) == single_day
+
     def test_closed_day_returns_empty_context(self, client, full_setup, monkeypatch):
         client.post(
             "/hours/special",
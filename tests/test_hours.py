@@ -1,5 +1,5 @@
 import pytest
-from datetime import date, datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
 
 from rezzy.core.security import get_current_user, hash_password
 from rezzy.main import app
@@ -25,6 +25,14 @@ def use_non_admin_user(db):
     return user
 
 
+def get_next_weekday(start_date: date, weekday: int) -> date:
+    """Get the next occurrence of a weekday (0=Monday, 6=Sunday)."""
+    days_ahead = weekday - start_date.weekday()
+    if days_ahead <= 0:
+        days_ahead += 7
+    return start_date + timedelta(days=days_ahead)
+
+
 class TestOperatingHours:
     def test_create_operating_hours(self, client):
         response = client.post(
@@ -252,7 +260,8 @@ class TestSpecialHours:
         client.post("/hours/special", json={"date": "2026-05-01", "is_closed": True})
 
         response = client.delete("/hours/special/2026-05-01")
-        assert response.status_code == 204
+        assert response.status_code == 200
+        assert response.json() == {"date": "2026-05-01", "affected_reservations": []}
 
         # Verify deleted
         response = client.get("/hours/special/2026-05-01")
@@ -283,3 +292,370 @@ class TestSpecialHours:
 
         response = client.delete("/hours/special/2026-12-24")
         assert response.status_code == 403
+
+
+class TestHoursCache:
+    def test_steady_state_validation_runs_no_queries(self, client, db, query_counter):
+        from rezzy.services.hours_service import HoursValidationService
+
+        client.post(
+            "/hours/operating",
+            json={"day_of_week": 0, "open_time": "11:00:00", "close_time": "22:00:00"},
+        )
+        monday = date(2026, 11, 2)
+        assert HoursValidationService.is_time_within_hours(db, monday, time(18, 0)) == (True, None)
+
+        query_counter.clear()
+        for hour in (12, 15, 19):
+            HoursValidationService.is_time_within_hours(db, monday, time(hour, 0))
+        assert query_counter == []
+
+    def test_local_writes_are_visible_immediately(self, client, db):
+        from rezzy.services.hours_service import HoursValidationService
+
+        client.post(
+            "/hours/operating",
+            json={"day_of_week": 0, "open_time": "11:00:00", "close_time": "22:00:00"},
+        )
+        monday = date(2026, 11, 2)
+        assert HoursValidationService.get_hours_for_date(db, monday)[2] is False
+
+        client.post("/hours/special", json={"date": "2026-11-02", "is_closed": True})
+        assert HoursValidationService.get_hours_for_date(db, monday)[2] is True
+
+        client.delete("/hours/special/2026-11-02")
+        assert HoursValidationService.get_hours_for_date(db, monday)[2] is False
+
+    def test_other_workers_writes_are_seen_after_version_check(self, client, db, monkeypatch):
+        from rezzy.core.config import get_settings
+        from rezzy.models import ChangeCounter, SpecialHours
+        from rezzy.services.hours_service import HoursValidationService
+
+        client.post(
+            "/hours/operating",
+            json={"day_of_week": 0, "open_time": "11:00:00", "close_time": "22:00:00"},
+        )
+        monday = date(2026, 11, 2)
+        assert HoursValidationService.get_hours_for_date(db, monday)[2] is False
+
+        # Another worker closes the day: its cache clear never reaches us,
+        # only the bumped version row does.
+        db.add(SpecialHours(date=monday, is_closed=True))
+        ChangeCounter.bump(db, "hours")
+        db.commit()
+        assert HoursValidationService.get_hours_for_date(db, monday)[2] is False
+
+        monkeypatch.setattr(get_settings(), "hours_cache_check_seconds", 0)
+        assert HoursValidationService.get_hours_for_date(db, monday)[2] is True
+
+    def test_reload_runs_outside_the_lock(self, client, db, monkeypatch):
+        from rezzy.services import hours_service
+
+        load_hours = hours_service._load_hours
+        seen = []
+
+        def checked_load(session):
+            seen.append(hours_service._hours_lock.locked())
+            # A local write lands while this load is in flight
+            hours_service.clear_hours_cache()
+            return load_hours(session)
+
+        hours_service.clear_hours_cache()
+        monkeypatch.setattr(hours_service, "_load_hours", checked_load)
+        hours_service.get_hours_snapshot(db)
+
+        assert seen == [False]
+        # The load may predate that write, so it isn't kept
+        assert hours_service._hours_snapshot is None
+
+
+class TestBusinessCalendar:
+    def test_calendar_resolves_weekly_and_special_hours(self, client, operating_hours):
+        monday = get_next_weekday(date.today(), 0)
+        client.post("/hours/special", json={"date": monday.isoformat(), "is_closed": True})
+        tuesday = monday + timedelta(days=1)
+        client.post(
+            "/hours/special",
+            json={"date": tuesday.isoformat(), "open_time": "12:00:00", "close_time": "16:00:00"},
+        )
+
+        response = client.get(
+            "/hours/calendar",
+            params={"start_date": monday.isoformat(), "end_date": (monday + timedelta(days=6)).isoformat()},
+        )
+        assert response.status_code == 200
+        days = response.json()
+        assert len(days) == 7
+        assert days[0]["is_closed"] is True and days[0]["is_special"] is True
+        assert days[1]["opens_at"] == f"{tuesday.isoformat()}T12:00:00"
+        assert days[1]["closes_at"] == f"{tuesday.isoformat()}T16:00:00"
+        assert days[2]["is_special"] is False
+
+        response = client.get(
+            "/hours/calendar",
+            params={
+                "start_date": monday.isoformat(),
+                "end_date": (monday + timedelta(days=6)).isoformat(),
+                "open_only": True,
+            },
+        )
+        assert monday.isoformat() not in [day["date"] for day in response.json()]
+
+    def test_hours_writes_regenerate_affected_dates(self, client, db, operating_hours):
+        from rezzy.models import BusinessCalendarDay
+        from rezzy.services import BusinessCalendarService
+
+        monday = get_next_weekday(date.today(), 0)
+        BusinessCalendarService.get_calendar(db, monday, monday + timedelta(days=13))
+
+        client.patch("/hours/operating/0", json={"close_time": "15:00:00"})
+        client.post("/hours/special", json={"date": (monday + timedelta(days=2)).isoformat(), "is_closed": True})
+        db.expire_all()
+
+        rows = {
+            row.date: row
+            for row in db.query(BusinessCalendarDay).filter(
+                BusinessCalendarDay.date.between(monday, monday + timedelta(days=13))
+            )
+        }
+        assert rows[monday].close_time.isoformat() == "15:00:00"
+        assert rows[monday + timedelta(days=7)].close_time.isoformat() == "15:00:00"
+        assert rows[monday + timedelta(days=1)].close_time != rows[monday].close_time
+        assert rows[monday + timedelta(days=2)].is_closed is True
+
+        client.delete(f"/hours/special/{(monday + timedelta(days=2)).isoformat()}")
+        db.expire_all()
+        assert db.get(BusinessCalendarDay, monday + timedelta(days=2)).is_closed is False
+
+    def test_refresh_overwrites_rows_in_place(self, client, db, operating_hours, query_counter):
+        from rezzy.models import BusinessCalendarDay
+        from rezzy.services import BusinessCalendarService
+
+        monday = get_next_weekday(date.today(), 0)
+        # Written by another request moments earlier, from older hours
+        db.query(BusinessCalendarDay).filter(BusinessCalendarDay.date == monday).update(
+            {"is_closed": True}
+        )
+        db.commit()
+
+        query_counter.clear()
+        BusinessCalendarService.refresh(db, dates=[monday])
+        db.commit()
+        assert not any(s.lstrip().upper().startswith("DELETE") for s in query_counter)
+        db.expire_all()
+        assert db.get(BusinessCalendarDay, monday).is_closed is False
+
+    def test_materialised_range_is_a_single_query(self, client, db, operating_hours, query_counter):
+        from rezzy.services import BusinessCalendarService
+
+        monday = get_next_weekday(date.today(), 0)
+        BusinessCalendarService.get_calendar(db, monday, monday + timedelta(days=90))
+
+        query_counter.clear()
+        days = BusinessCalendarService.get_calendar(db, monday, monday + timedelta(days=90))
+        assert len(days) == 91
+        assert len(query_counter) == 1
+
+
+class TestBulkSpecialHours:
+    def test_bulk_upsert_expands_ranges_and_yearly_repeats(self, client):
+        client.post("/hours/special", json={"date": "2026-12-24", "is_closed": True, "reason": "Old"})
+
+        response = client.post(
+            "/hours/special/bulk",
+            json={
+                "entries": [
+                    {
+                        "date": "2026-12-24",
+                        "open_time": "11:00:00",
+                        "close_time": "15:00:00",
+                        "reason": "Christmas Eve",
+                        "repeat_yearly_until": "2028-12-31",
+                    },
+                    {"date": "2027-01-01", "end_date": "2027-01-03", "is_closed": True},
+                    {"date": "2028-02-29", "is_closed": True, "repeat_yearly_until": "2030-12-31"},
+                ]
+            },
+        )
+        assert response.status_code == 201
+        assert response.json() == {
+            "created": [
+                "2027-01-01", "2027-01-02", "2027-01-03",
+                "2027-12-24", "2028-02-29", "2028-12-24",
+            ],
+            "updated": ["2026-12-24"],
+            "affected_reservations": [],
+        }
+
+        replaced = client.get("/hours/special/2026-12-24").json()
+        assert replaced["is_closed"] is False
+        assert replaced["close_time"] == "15:00:00"
+        assert replaced["reason"] == "Christmas Eve"
+
+    def test_bulk_upsert_is_one_existence_query(self, client, query_counter):
+        query_counter.clear()
+        response = client.post(
+            "/hours/special/bulk",
+            json={"entries": [{"date": "2027-01-01", "end_date": "2027-12-31", "is_closed": True}]},
+        )
+        assert response.status_code == 201
+        assert len(response.json()["created"]) == 365
+        special_selects = [
+            s for s in query_counter
+            if s.lstrip().upper().startswith("SELECT") and "FROM special_hours" in s
+        ]
+        assert len(special_selects) == 2  # existence check, then the calendar reload
+
+    def test_bulk_upsert_rejects_overlapping_entries(self, client):
+        response = client.post(
+            "/hours/special/bulk",
+            json={
+                "entries": [
+                    {"date": "2026-12-20", "end_date": "2026-12-26", "is_closed": True},
+                    {"date": "2026-12-24", "is_closed": True},
+                ]
+            },
+        )
+        assert response.status_code == 400
+        assert "2026-12-24" in response.json()["detail"]
+        assert client.get("/hours/special").json() == []
+
+    def test_bulk_upsert_limits_how_many_dates_it_expands_to(self, client):
+        response = client.post(
+            "/hours/special/bulk",
+            json={"entries": [{"date": "2026-12-24", "is_closed": True, "repeat_yearly_until": "9999-12-31"}]},
+        )
+        assert response.status_code == 422
+
+        response = client.post(
+            "/hours/special/bulk",
+            json={
+                "entries": [
+                    {"date": f"{2027 + n}-01-01", "end_date": f"{2027 + n}-12-31", "is_closed": True}
+                    for n in range(14)
+                ]
+            },
+        )
+        assert response.status_code == 422
+        assert client.get("/hours/special").json() == []
+
+    def test_bulk_upsert_requires_admin(self, client, db):
+        use_non_admin_user(db)
+        response = client.post(
+            "/hours/special/bulk",
+            json={"entries": [{"date": "2026-12-24", "is_closed": True}]},
+        )
+        assert response.status_code == 403
+
+
+class TestHoursChangeImpact:
+    @staticmethod
+    def book(client, table_id, day, at, guest="Guest"):
+        response = client.post(
+            "/reservations",
+            json={
+                "guest_name": guest,
+                "party_size": 2,
+                "reservation_date": day.isoformat(),
+                "reservation_time": at,
+                "table_ids": [table_id],
+            },
+        )
+        assert response.status_code == 201, response.json()
+        return response.json()
+
+    def test_shortening_a_day_reports_reservations_left_outside(self, client, full_setup):
+        monday = get_next_weekday(date.today(), 0)
+        table_id = full_setup["table"]["id"]
+        self.book(client, table_id, monday, "12:00:00", "Lunch")
+        late = self.book(client, table_id, monday, "20:00:00", "Late")
+        cancelled = self.book(client, table_id, monday, "21:30:00", "Cancelled")
+        client.post(f"/reservations/{cancelled['id']}/cancel")
+
+        response = client.patch("/hours/operating/0", json={"close_time": "20:00:00"})
+        assert response.status_code == 200
+        affected = response.json()["affected_reservations"]
+        assert [a["reservation_id"] for a in affected] == [late["id"]]
+        assert "before closing" in affected[0]["reason"]
+        assert response.json()["close_time"] == "20:00:00"
+
+    def test_closure_can_be_rejected_when_it_invalidates_bookings(self, client, full_setup):
+        monday = get_next_weekday(date.today(), 0)
+        booked = self.book(client, full_setup["table"]["id"], monday, "18:00:00")
+
+        response = client.post(
+            "/hours/special",
+            params={"reject_conflicts": True},
+            json={"date": monday.isoformat(), "is_closed": True},
+        )
+        assert response.status_code == 400
+        assert f"#{booked['id']}" in response.json()["detail"]
+        assert client.get(f"/hours/special/{monday.isoformat()}").json() is None
+        calendar = client.get(
+            "/hours/calendar",
+            params={"start_date": monday.isoformat(), "end_date": monday.isoformat()},
+        ).json()
+        assert calendar[0]["is_closed"] is False
+
+        response = client.post(
+            "/hours/special", json={"date": monday.isoformat(), "is_closed": True}
+        )
+        assert response.status_code == 201
+        assert [a["reason"] for a in response.json()["affected_reservations"]] == [
+            "Restaurant is closed on this date"
+        ]
+
+    def test_impact_is_one_query_across_all_affected_dates(
+        self, client, full_setup, query_counter
+    ):
+        monday = get_next_weekday(date.today(), 0)
+        for week in range(4):
+            self.book(client, full_setup["table"]["id"], monday + timedelta(weeks=week), "21:00:00")
+
+        query_counter.clear()
+        response = client.patch("/hours/operating/0", json={"close_time": "21:00:00"})
+        assert len(response.json()["affected_reservations"]) == 4
+        reservation_selects = [
+            s for s in query_counter
+            if s.lstrip().upper().startswith("SELECT") and "FROM reservations" in s
+        ]
+        assert len(reservation_selects) == 1
+
+    def test_deleting_an_override_reports_what_the_regular_hours_invalidate(
+        self, client, full_setup
+    ):
+        monday = get_next_weekday(date.today(), 0)
+        client.post(
+            "/hours/special",
+            json={"date": monday.isoformat(), "open_time": "11:00:00", "close_time": "23:59:00"},
+        )
+        late = self.book(client, full_setup["table"]["id"], monday, "22:30:00", "Late")
+
+        response = client.delete(f"/hours/special/{monday.isoformat()}")
+        assert response.status_code == 200
+        affected = response.json()["affected_reservations"]
+        assert [a["reservation_id"] for a in affected] == [late["id"]]
+
+    def test_bookings_beyond_the_calendar_horizon_are_checked(
+        self, client, full_setup, monkeypatch
+    ):
+        from rezzy.core.config import get_settings
+
+        monkeypatch.setattr(get_settings(), "business_calendar_horizon_days", 7)
+        table_id = full_setup["table"]["id"]
+        far_monday = get_next_weekday(date.today() + timedelta(days=14), 0)
+        late = self.book(client, table_id, far_monday, "21:00:00", "Late")
+        far_tuesday = far_monday + timedelta(days=1)
+        closed = self.book(client, table_id, far_tuesday, "12:00:00", "Closed")
+
+        response = client.patch("/hours/operating/0", json={"close_time": "21:00:00"})
+        assert [a["reservation_id"] for a in response.json()["affected_reservations"]] == [
+            late["id"]
+        ]
+
+        response = client.post(
+            "/hours/special", json={"date": far_tuesday.isoformat(), "is_closed": True}
+        )
+        assert [a["reservation_id"] for a in response.json()["affected_reservations"]] == [
+            closed["id"]
+        ]
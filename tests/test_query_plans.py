@@ -0,0 +1,192 @@
+"""
+EXPLAIN checks for the reservation hot paths.
+
+These need a throwaway PostgreSQL database (its tables are dropped and
+recreated) and only run when REZZY_EXPLAIN_DATABASE_URL points at one, e.g.
+
+    REZZY_EXPLAIN_DATABASE_URL=postgresql://localhost/rezzy_explain pytest tests/test_query_plans.py
+"""
+import os
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from rezzy.core.database import Base
+from rezzy.models import Reservation, Table, reservation_tables
+from rezzy.models.user import User
+from rezzy.services.availability_service import load_day_availability
+from rezzy.services.reservation_service import ReservationService
+
+
+EXPLAIN_DATABASE_URL = os.environ.get("REZZY_EXPLAIN_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not EXPLAIN_DATABASE_URL,
+    reason="REZZY_EXPLAIN_DATABASE_URL is not set",
+)
+
+HOT_RELATIONS = {"reservations", "reservation_tables"}
+SEED_START = date(2026, 1, 1)
+SEED_DAYS = 365
+SEED_TABLES = 40
+SEATINGS = [time(h, m) for h in range(11, 22, 2) for m in (0, 30)]
+STATUSES = ["completed", "completed", "cancelled", "no_show", "confirmed", "seated"]
+
+
+@pytest.fixture(scope="module")
+def pg_session():
+    engine = create_engine(EXPLAIN_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(username="explain", hashed_password="-", role="admin", is_active=True)
+            .returning(User.id)
+        ).scalar_one()
+        conn.execute(insert(Table), [
+            {
+                "table_number": f"T{n}",
+                "x_position": 0.0,
+                "y_position": 0.0,
+                "default_chairs": 4,
+                "max_chairs": 6,
+                "current_chairs": 4,
+            }
+            for n in range(1, SEED_TABLES + 1)
+        ])
+
+        reservations, links = [], []
+        reservation_id = 0
+        for day_offset in range(SEED_DAYS):
+            day = SEED_START + timedelta(days=day_offset)
+            for table_id in range(1, SEED_TABLES + 1):
+                for seating in SEATINGS[table_id % 2::2]:
+                    reservation_id += 1
+                    starts_at = datetime.combine(day, seating)
+                    ends_at = starts_at + timedelta(minutes=90)
+                    state = STATUSES[reservation_id % len(STATUSES)]
+                    reservations.append({
+                        "id": reservation_id,
+                        "guest_name": f"Guest {reservation_id}",
+                        "party_size": 2,
+                        "reservation_date": day,
+                        "reservation_time": seating,
+                        "duration_minutes": 90,
+                        "starts_at": starts_at,
+                        "ends_at": ends_at,
+                        "status": state,
+                        "created_by_user_id": user_id,
+                        "change_seq": reservation_id,
+                    })
+                    links.append({
+                        "reservation_id": reservation_id,
+                        "table_id": table_id,
+                        "starts_at": starts_at,
+                        "ends_at": ends_at,
+                        "is_active": state in ("confirmed", "seated"),
+                    })
+        conn.execute(insert(Reservation), reservations)
+        conn.execute(insert(reservation_tables), links)
+        conn.execute(text("SELECT setval(pg_get_serial_sequence('reservations', 'id'), :n)"), {"n": reservation_id})
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def capture_selects(session, run) -> list[tuple[str, object]]:
+    """Run ``run`` and return the SELECT statements it sent, with parameters."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        session.rollback()
+    return statements
+
+
+def sequential_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_RELATIONS:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += sequential_scans(child)
+    return found
+
+
+def assert_no_sequential_scans(session, run):
+    statements = capture_selects(session, run)
+    assert statements
+    conn = session.connection()
+    for statement, parameters in statements:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + statement, parameters
+        ).scalar_one()
+        scans = sequential_scans(plan[0]["Plan"])
+        assert not scans, f"Sequential scan on {scans} for:\n{statement}"
+    session.rollback()
+
+
+MID_YEAR = SEED_START + timedelta(days=180)
+
+
+class TestHotQueryPlans:
+    def test_reservations_for_a_day(self, pg_session):
+        assert_no_sequential_scans(
+            pg_session,
+            lambda: ReservationService.get_reservations(pg_session, MID_YEAR, MID_YEAR),
+        )
+
+    def test_reservations_for_a_table(self, pg_session):
+        assert_no_sequential_scans(
+            pg_session,
+            lambda: ReservationService.get_reservations(
+                pg_session, MID_YEAR, MID_YEAR + timedelta(days=6), table_id=7
+            ),
+        )
+
+    def test_reservation_page_after_cursor(self, pg_session):
+        cursor = ReservationService.encode_cursor(MID_YEAR, time(18, 0), 1)
+        assert_no_sequential_scans(
+            pg_session,
+            lambda: ReservationService.get_reservation_fields(
+                pg_session, ["table_ids"], limit=100, cursor=cursor
+            ),
+        )
+
+    def test_overlap_check(self, pg_session):
+        assert_no_sequential_scans(
+            pg_session,
+            lambda: ReservationService._overlapping_reservations(
+                pg_session, [3, 4], MID_YEAR, time(19, 0), 90
+            ),
+        )
+
+    def test_day_occupancy(self, pg_session):
+        assert_no_sequential_scans(
+            pg_session, lambda: load_day_availability(pg_session, MID_YEAR)
+        )
+
+    def test_changes_since_recent_cursor(self, pg_session):
+        assert_no_sequential_scans(
+            pg_session, lambda: ReservationService.get_changes(pg_session, since=10**9)
+        )
@@ -1,5 +1,31 @@
+import csv
+import io
+import json
 import pytest
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta, timezone
+
+from rezzy.core.security import get_current_user, hash_password
+from rezzy.main import app
+from rezzy.models.user import User
+
+
+def use_non_admin_user(db):
+    user = User(
+        username="test-user",
+        hashed_password=hash_password("password123"),
+        role="user",
+        is_active=True,
+        approved_at=datetime.now(timezone.utc),
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+    def override_get_current_user():
+        return user
+
+    app.dependency_overrides[get_current_user] = override_get_current_user
+    return user
 
 
 def get_next_weekday(start_date: date, weekday: int) -> date:
@@ -263,6 +289,46 @@ class TestReservations:
         assert response.status_code == 400
         assert "conflict" in response.json()["detail"].lower()
 
+    def test_back_to_back_reservations_do_not_conflict(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+
+        for guest, slot in (("First Guest", "18:00:00"), ("Second Guest", "19:30:00")):
+            response = client.post(
+                "/reservations",
+                json={
+                    "guest_name": guest,
+                    "party_size": 2,
+                    "reservation_date": reservation_date.isoformat(),
+                    "reservation_time": slot,
+                    "table_ids": [full_setup["table"]["id"]],
+                },
+            )
+            assert response.status_code == 201
+
+    def test_update_reservation_keeps_time_window_in_sync(self, client, db, full_setup):
+        from rezzy.models import Reservation
+
+        reservation_date = get_next_weekday(date.today(), 0)
+        created = client.post(
+            "/reservations",
+            json={
+                "guest_name": "Window Test",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [full_setup["table"]["id"]],
+            },
+        ).json()
+
+        client.patch(
+            f"/reservations/{created['id']}",
+            json={"reservation_time": "19:00:00", "duration_minutes": 120},
+        )
+
+        reservation = db.get(Reservation, created["id"])
+        assert reservation.starts_at == datetime.combine(reservation_date, time(19, 0))
+        assert reservation.ends_at == datetime.combine(reservation_date, time(21, 0))
+
     def test_get_reservations(self, client, full_setup):
         reservation_date = get_next_weekday(date.today(), 0)
 
@@ -283,6 +349,149 @@ class TestReservations:
         assert response.status_code == 200
         assert len(response.json()) == 3
 
+    def test_get_reservations_query_count_independent_of_result_size(
+        self, client, db, full_setup, query_counter
+    ):
+        def list_reservations(guests: int) -> int:
+            reservation_date = get_next_weekday(date.today(), 0) + timedelta(weeks=guests)
+            for i in range(guests):
+                client.post(
+                    "/reservations",
+                    json={
+                        "guest_name": f"Guest {i+1}",
+                        "party_size": 2,
+                        "reservation_date": reservation_date.isoformat(),
+                        "reservation_time": f"{12 + 2 * i}:00:00",
+                        "table_ids": [full_setup["table"]["id"]],
+                    },
+                )
+            db.expunge_all()
+            query_counter.clear()
+            response = client.get(
+                "/reservations",
+                params={"start_date": reservation_date.isoformat(), "end_date": reservation_date.isoformat()},
+            )
+            assert response.status_code == 200
+            assert len(response.json()) == guests
+            assert all(r["table_ids"] and r["created_by_username"] for r in response.json())
+            return len(query_counter)
+
+        assert list_reservations(1) == list_reservations(5)
+
+    def test_get_reservations_keyset_pages(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        for i, time_slot in enumerate(["12:00:00", "14:00:00", "18:00:00"]):
+            for day in (reservation_date, reservation_date + timedelta(days=1)):
+                client.post(
+                    "/reservations",
+                    json={
+                        "guest_name": f"Guest {i+1}",
+                        "party_size": 2,
+                        "reservation_date": day.isoformat(),
+                        "reservation_time": time_slot,
+                        "table_ids": [full_setup["table"]["id"]],
+                    },
+                )
+        everything = [r["id"] for r in client.get("/reservations").json()]
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 4} | ({"cursor": cursor} if cursor else {})
+            response = client.get("/reservations", params=params)
+            assert response.status_code == 200
+            seen += [r["id"] for r in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert seen == everything
+        assert len(seen) == 6
+
+    def test_get_reservations_field_projection(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        for time_slot in ["12:00:00", "14:00:00"]:
+            client.post(
+                "/reservations",
+                json={
+                    "guest_name": "Guest",
+                    "party_size": 2,
+                    "reservation_date": reservation_date.isoformat(),
+                    "reservation_time": time_slot,
+                    "table_ids": [full_setup["table"]["id"]],
+                },
+            )
+
+        response = client.get("/reservations", params={"fields": "table_ids", "limit": 1})
+        assert response.status_code == 200
+        assert response.json() == [{"id": 1, "table_ids": [full_setup["table"]["id"]]}]
+
+        response = client.get(
+            "/reservations",
+            params={"fields": "reservation_time", "cursor": response.headers["X-Next-Cursor"]},
+        )
+        assert response.json() == [{"id": 2, "reservation_time": "14:00:00"}]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_get_reservations_rejects_bad_cursor_and_fields(self, client, full_setup):
+        assert client.get("/reservations", params={"cursor": "nonsense"}).status_code == 400
+        assert client.get("/reservations", params={"fields": "tables"}).status_code == 400
+
+    def test_export_reservations_ndjson(self, client, sample_tables, operating_hours):
+        reservation_date = get_next_weekday(date.today(), 0)
+        client.post(
+            "/reservations",
+            json={
+                "guest_name": "Group",
+                "party_size": 6,
+                "phone_number": "555-123-4567",
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [sample_tables[1]["id"], sample_tables[0]["id"]],
+            },
+        )
+        client.post(
+            "/reservations",
+            json={
+                "guest_name": "Pair",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "12:00:00",
+                "table_ids": [sample_tables[2]["id"]],
+            },
+        )
+
+        response = client.get("/reservations/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["guest_name"] for r in rows] == ["Pair", "Group"]
+        assert rows[1]["table_numbers"] == ["T1", "T2"]
+        assert rows[1]["created_by_username"] == "test-admin"
+        assert rows[1]["reservation_time"] == "18:00:00"
+
+    def test_export_reservations_csv(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        client.post(
+            "/reservations",
+            json={
+                "guest_name": "Doe, Jane",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [full_setup["table"]["id"]],
+            },
+        )
+
+        response = client.get("/reservations/export", params={"format": "csv"})
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["guest_name"] == "Doe, Jane"
+        assert rows[0]["table_numbers"] == "T1"
+        assert rows[0]["created_by_username"] == "test-admin"
+
+        assert client.get("/reservations/export", params={"format": "xml"}).status_code == 422
+
     def test_get_reservations_by_date(self, client, full_setup):
         date1 = get_next_weekday(date.today(), 0)
         date2 = get_next_weekday(date.today(), 1)  # Next Tuesday
@@ -584,6 +793,394 @@ class TestReservations:
         assert response.status_code == 400
 
 
+class TestArchive:
+    def add_past(self, db, table_id, days_ago, status="completed"):
+        from rezzy.models import Reservation, Table
+
+        reservation = Reservation(
+            guest_name=f"Past {days_ago}",
+            party_size=2,
+            reservation_date=date.today() - timedelta(days=days_ago),
+            reservation_time=time(18, 0),
+            duration_minutes=90,
+            status=status,
+        )
+        reservation.sync_time_window()
+        reservation.tables = [db.get(Table, table_id)]
+        db.add(reservation)
+        db.commit()
+        return reservation.id
+
+    def test_archive_moves_old_rows_in_batches(self, client, db, full_setup):
+        from rezzy.services import ReservationService
+
+        table_id = full_setup["table"]["id"]
+        old_ids = [self.add_past(db, table_id, days_ago) for days_ago in (400, 390, 380)]
+        recent_id = self.add_past(db, table_id, 10, status="cancelled")
+
+        before = date.today() - timedelta(days=365)
+        assert ReservationService.archive_reservations(db, before, batch_size=2) == 3
+        assert ReservationService.archive_reservations(db, before) == 0
+
+        live = client.get("/reservations").json()
+        assert [r["id"] for r in live] == [recent_id]
+
+        everything = client.get("/reservations", params={"include_archived": True}).json()
+        assert [r["id"] for r in everything] == old_ids + [recent_id]
+        assert everything[0]["table_ids"] == [table_id]
+        assert everything[0]["status"] == "completed"
+
+    def test_archived_rows_page_and_filter_with_live_rows(self, client, db, full_setup):
+        from rezzy.services import ReservationService
+
+        table_id = full_setup["table"]["id"]
+        old_ids = [self.add_past(db, table_id, days_ago) for days_ago in (30, 20)]
+        recent_id = self.add_past(db, table_id, 5)
+        ReservationService.archive_reservations(db, date.today() - timedelta(days=10))
+
+        page = client.get(
+            "/reservations", params={"include_archived": True, "limit": 2, "table_id": table_id}
+        )
+        assert [r["id"] for r in page.json()] == old_ids
+        rest = client.get(
+            "/reservations",
+            params={"include_archived": True, "limit": 2, "cursor": page.headers["X-Next-Cursor"]},
+        )
+        assert [r["id"] for r in rest.json()] == [recent_id]
+
+    def test_field_projection_includes_archived_rows(self, client, db, full_setup):
+        from rezzy.services import ReservationService
+
+        table_id = full_setup["table"]["id"]
+        old_ids = [self.add_past(db, table_id, days_ago) for days_ago in (30, 20)]
+        recent_id = self.add_past(db, table_id, 5)
+        ReservationService.archive_reservations(db, date.today() - timedelta(days=10))
+
+        live = client.get("/reservations", params={"fields": "status"}).json()
+        assert [r["id"] for r in live] == [recent_id]
+
+        page = client.get(
+            "/reservations",
+            params={"fields": "status,table_ids", "include_archived": True, "limit": 2},
+        )
+        assert page.json() == [
+            {"id": rid, "status": "completed", "table_ids": [table_id]} for rid in old_ids
+        ]
+        rest = client.get(
+            "/reservations",
+            params={
+                "fields": "status",
+                "include_archived": True,
+                "cursor": page.headers["X-Next-Cursor"],
+            },
+        )
+        assert [r["id"] for r in rest.json()] == [recent_id]
+
+    def test_archived_rows_export_and_lookup_on_request(self, client, db, full_setup):
+        from rezzy.services import ReservationService
+
+        table_id = full_setup["table"]["id"]
+        old_ids = [self.add_past(db, table_id, days_ago) for days_ago in (30, 20)]
+        recent_id = self.add_past(db, table_id, 5)
+        ReservationService.archive_reservations(db, date.today() - timedelta(days=10))
+
+        live = client.get("/reservations/export").text.splitlines()
+        assert [json.loads(line)["id"] for line in live] == [recent_id]
+
+        response = client.get("/reservations/export", params={"include_archived": True})
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["id"] for r in rows] == old_ids + [recent_id]
+        assert rows[0]["table_numbers"] == ["T1"]
+
+        archived = client.get(f"/reservations/{old_ids[0]}")
+        assert archived.status_code == 200
+        assert archived.json()["status"] == "completed"
+        assert client.patch(
+            f"/reservations/{old_ids[0]}", json={"notes": "late"}
+        ).status_code == 404
+
+    def test_cannot_archive_future_dates(self, db):
+        from fastapi import HTTPException
+        from rezzy.services import ReservationService
+
+        with pytest.raises(HTTPException):
+            ReservationService.archive_reservations(db, date.today() + timedelta(days=1))
+
+
+class TestReservationTableLookup:
+    def test_create_reports_every_missing_table(self, client, full_setup):
+        response = client.post(
+            "/reservations",
+            json={
+                "guest_name": "Guest",
+                "party_size": 2,
+                "reservation_date": get_next_weekday(date.today(), 0).isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [full_setup["table"]["id"], 998, 999],
+            },
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Tables 998, 999 not found"
+
+    def test_update_reports_every_inactive_table(self, client, sample_tables, operating_hours):
+        reservation_date = get_next_weekday(date.today(), 0)
+        created = client.post(
+            "/reservations",
+            json={
+                "guest_name": "Guest",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [sample_tables[0]["id"]],
+            },
+        ).json()
+        for table in sample_tables[1:]:
+            client.patch(f"/tables/{table['id']}", json={"is_active": False})
+
+        response = client.patch(
+            f"/reservations/{created['id']}",
+            json={"table_ids": [t["id"] for t in sample_tables]},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Tables T2, T3 are not active"
+
+    def test_combo_tables_load_in_one_query(
+        self, client, sample_tables, operating_hours, query_counter
+    ):
+        query_counter.clear()
+        response = client.post(
+            "/reservations",
+            json={
+                "guest_name": "Group",
+                "party_size": 10,
+                "phone_number": "555-123-4567",
+                "reservation_date": get_next_weekday(date.today(), 0).isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [t["id"] for t in reversed(sample_tables)],
+            },
+        )
+        assert response.status_code == 201
+        table_selects = [
+            q for q in query_counter
+            if q.startswith("SELECT") and "FROM tables" in q and "reservation_tables" not in q
+        ]
+        assert len(table_selects) == 1
+
+
+class TestReservationChanges:
+    def create(self, client, table_id, time_slot="18:00:00"):
+        return client.post(
+            "/reservations",
+            json={
+                "guest_name": "Guest",
+                "party_size": 2,
+                "reservation_date": get_next_weekday(date.today(), 0).isoformat(),
+                "reservation_time": time_slot,
+                "table_ids": [table_id],
+            },
+        ).json()
+
+    def test_changes_since_cursor(self, client, full_setup):
+        table_id = full_setup["table"]["id"]
+        first = self.create(client, table_id, "12:00:00")
+        second = self.create(client, table_id, "18:00:00")
+
+        response = client.get("/reservations/changes")
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["id"] for r in data["changes"]] == [first["id"], second["id"]]
+        cursor = data["cursor"]
+
+        data = client.get("/reservations/changes", params={"since": cursor}).json()
+        assert data == {"cursor": cursor, "has_more": False, "changes": []}
+
+        client.patch(f"/reservations/{first['id']}", json={"party_size": 3})
+        client.post(f"/reservations/{second['id']}/cancel")
+        data = client.get("/reservations/changes", params={"since": cursor}).json()
+        assert [(r["id"], r["status"]) for r in data["changes"]] == [
+            (first["id"], "confirmed"),
+            (second["id"], "cancelled"),
+        ]
+        assert data["cursor"] > cursor
+
+    def test_counter_is_bumped_last(self, client, full_setup, query_counter):
+        query_counter.clear()
+        self.create(client, full_setup["table"]["id"])
+        writes = [
+            s.split()[0:3] for s in query_counter
+            if s.lstrip().upper().startswith(("INSERT", "UPDATE"))
+        ]
+        bump = writes.index(["UPDATE", "change_counters", "SET"])
+        # Only the counter (created on first use here) and the stamp follow it
+        assert all("change_counters" in w or w[:2] == ["UPDATE", "reservations"] for w in writes[bump:])
+        assert ["INSERT", "INTO", "reservation_tables"] in writes[:bump]
+
+    def test_deleting_a_table_reports_its_reservations_as_changed(self, client, full_setup):
+        other = client.post(
+            "/tables",
+            json={
+                "table_number": "T9",
+                "x_position": 150.0,
+                "y_position": 100.0,
+                "default_chairs": 4,
+                "max_chairs": 6,
+            },
+        ).json()
+        created = self.create(client, other["id"])
+        cursor = client.get("/reservations/changes").json()["cursor"]
+
+        client.delete(f"/tables/{other['id']}")
+        data = client.get("/reservations/changes", params={"since": cursor}).json()
+        assert [(r["id"], r["table_ids"]) for r in data["changes"]] == [(created["id"], [])]
+
+    def test_changes_are_paged(self, client, full_setup):
+        table_id = full_setup["table"]["id"]
+        for time_slot in ["12:00:00", "14:00:00", "18:00:00"]:
+            self.create(client, table_id, time_slot)
+
+        page = client.get("/reservations/changes", params={"limit": 2}).json()
+        assert len(page["changes"]) == 2
+        assert page["has_more"] is True
+
+        rest = client.get(
+            "/reservations/changes", params={"since": page["cursor"], "limit": 2}
+        ).json()
+        assert len(rest["changes"]) == 1
+        assert rest["has_more"] is False
+
+    def test_reservation_response_carries_change_stamp(self, client, full_setup):
+        created = self.create(client, full_setup["table"]["id"])
+        assert created["change_seq"] > 0
+        assert created["updated_at"] is not None
+
+        updated = client.patch(
+            f"/reservations/{created['id']}", json={"notes": "Window seat"}
+        ).json()
+        assert updated["change_seq"] > created["change_seq"]
+
+
+class TestBatchReservations:
+    def item(self, table_id, time_slot, guest="Guest", days_ahead=0):
+        reservation_date = get_next_weekday(date.today(), 0) + timedelta(days=days_ahead)
+        return {
+            "guest_name": guest,
+            "party_size": 2,
+            "reservation_date": reservation_date.isoformat(),
+            "reservation_time": time_slot,
+            "table_ids": [table_id],
+        }
+
+    def test_batch_create_commits_all(self, client, sample_tables, operating_hours):
+        response = client.post(
+            "/reservations/batch",
+            json={
+                "create": [
+                    self.item(sample_tables[0]["id"], "12:00:00"),
+                    self.item(sample_tables[0]["id"], "18:00:00"),
+                    self.item(sample_tables[1]["id"], "18:00:00", days_ahead=1),
+                ]
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["committed"] is True
+        assert all(r["error"] is None for r in data["results"])
+        assert data["results"][0]["reservation"]["table_ids"] == [sample_tables[0]["id"]]
+        assert len(client.get("/reservations").json()) == 3
+
+    def test_batch_items_conflict_with_each_other(self, client, full_setup):
+        table_id = full_setup["table"]["id"]
+        response = client.post(
+            "/reservations/batch",
+            json={
+                "create": [
+                    self.item(table_id, "18:00:00", "First"),
+                    self.item(table_id, "18:30:00", "Second"),
+                ]
+            },
+        )
+        data = response.json()
+        assert data["committed"] is False
+        assert data["results"][0]["error"] is None
+        assert "Conflicts" in data["results"][1]["error"]
+        assert client.get("/reservations").json() == []
+
+    def test_non_atomic_batch_commits_valid_items(self, client, full_setup):
+        table_id = full_setup["table"]["id"]
+        existing = client.post("/reservations", json=self.item(table_id, "18:00:00")).json()
+
+        response = client.post(
+            "/reservations/batch",
+            json={
+                "atomic": False,
+                "create": [
+                    self.item(table_id, "19:00:00", "Clash"),
+                    self.item(table_id, "12:00:00", "Lunch"),
+                    self.item(999, "14:00:00", "Nowhere"),
+                ],
+            },
+        )
+        data = response.json()
+        assert data["committed"] is True
+        errors = [r["error"] for r in data["results"]]
+        assert "Conflicts" in errors[0]
+        assert errors[1] is None
+        assert errors[2] == "Table 999 not found"
+        assert data["results"][1]["reservation"]["guest_name"] == "Lunch"
+        names = sorted(r["guest_name"] for r in client.get("/reservations").json())
+        assert names == [existing["guest_name"], "Lunch"]
+
+    def test_batch_update_frees_slot_for_create(self, client, full_setup):
+        table_id = full_setup["table"]["id"]
+        existing = client.post("/reservations", json=self.item(table_id, "18:00:00")).json()
+
+        response = client.post(
+            "/reservations/batch",
+            json={
+                "update": [{"id": existing["id"], "reservation_time": "12:00:00"}],
+                "create": [self.item(table_id, "18:00:00", "Newcomer")],
+            },
+        )
+        data = response.json()
+        assert data["committed"] is True
+        assert data["results"][0]["reservation"]["reservation_time"] == "12:00:00"
+        assert data["results"][1]["reservation"]["reservation_time"] == "18:00:00"
+
+    def test_batch_reports_unknown_reservation_and_closed_day(self, client, full_setup):
+        table_id = full_setup["table"]["id"]
+        closed = self.item(table_id, "18:00:00")
+        client.post("/hours/special", json={"date": closed["reservation_date"], "is_closed": True})
+
+        response = client.post(
+            "/reservations/batch",
+            json={"update": [{"id": 999, "notes": "?"}], "create": [closed]},
+        )
+        data = response.json()
+        assert data["committed"] is False
+        assert data["results"][0]["error"] == "Reservation 999 not found"
+        assert data["results"][1]["error"] == "Restaurant is closed on this date"
+
+    def test_batch_query_count_independent_of_size(self, client, sample_tables, operating_hours, query_counter):
+        def run(days_ahead: int, count: int) -> int:
+            query_counter.clear()
+            response = client.post(
+                "/reservations/batch",
+                json={
+                    "create": [
+                        self.item(sample_tables[i % 3]["id"], f"{12 + 2 * (i // 3)}:00:00", days_ahead=days_ahead)
+                        for i in range(count)
+                    ]
+                },
+            )
+            assert response.json()["committed"] is True
+            return len(query_counter)
+
+        small = run(0, 2)
+        large = run(7, 9)
+        # Only the reservation INSERTs grow with the batch
+        assert large - small <= 9 - 2
+
+
 class TestAvailableTables:
     def test_get_available_tables(self, client, full_setup):
         reservation_date = get_next_weekday(date.today(), 0)
@@ -681,3 +1278,469 @@ class TestAvailableTables:
         )
         assert response.status_code == 400
         assert "future" in response.json()["detail"].lower()
+
+    def test_get_available_tables_query_count_independent_of_floor_size(
+        self, client, full_setup, query_counter
+    ):
+        reservation_date = get_next_weekday(date.today(), 0)
+        params = {
+            "reservation_date": reservation_date.isoformat(),
+            "reservation_time": "18:00:00",
+            "party_size": 2,
+        }
+
+        client.get("/reservations/available", params=params)
+        baseline = len(query_counter)
+
+        for i in range(2, 12):
+            client.post(
+                "/tables",
+                json={"table_number": f"T{i}", "default_chairs": 4, "max_chairs": 6},
+            )
+        client.post(
+            "/reservations",
+            json={
+                "guest_name": "Booked",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:30:00",
+                "table_ids": [full_setup["table"]["id"]],
+            },
+        )
+
+        query_counter.clear()
+        response = client.get("/reservations/available", params=params)
+        assert response.status_code == 200
+        assert len(query_counter) <= baseline
+        assert len(response.json()) == 10
+        assert "T1" not in [o["table_numbers"][0] for o in response.json()]
+
+    def test_get_available_tables_suggests_combos_for_large_party(
+        self, client, sample_tables, operating_hours
+    ):
+        reservation_date = get_next_weekday(date.today(), 0)
+
+        response = client.get(
+            "/reservations/available",
+            params={
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "party_size": 6,
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 3
+        assert all(o["type"] == "combo" and len(o["table_ids"]) == 2 for o in data)
+        assert all(o["capacity"] == 8 for o in data)
+
+    def test_get_available_tables_tracks_bookings_and_cancellations(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        params = {
+            "reservation_date": reservation_date.isoformat(),
+            "reservation_time": "18:00:00",
+            "party_size": 2,
+        }
+        assert len(client.get("/reservations/available", params=params).json()) == 1
+
+        created = client.post(
+            "/reservations",
+            json={
+                "guest_name": "Booked",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "17:00:00",
+                "table_ids": [full_setup["table"]["id"]],
+            },
+        ).json()
+        assert client.get("/reservations/available", params=params).json() == []
+
+        client.patch(f"/reservations/{created['id']}", json={"reservation_time": "12:00:00"})
+        assert len(client.get("/reservations/available", params=params).json()) == 1
+
+        client.patch(f"/reservations/{created['id']}", json={"reservation_time": "17:30:00"})
+        assert client.get("/reservations/available", params=params).json() == []
+
+        client.post(f"/reservations/{created['id']}/cancel")
+        assert len(client.get("/reservations/available", params=params).json()) == 1
+
+    def test_repeat_available_lookup_served_from_cache(self, client, full_setup, query_counter):
+        reservation_date = get_next_weekday(date.today(), 0)
+        params = {
+            "reservation_date": reservation_date.isoformat(),
+            "reservation_time": "18:00:00",
+            "party_size": 2,
+        }
+        first = client.get("/reservations/available", params=params).json()
+
+        query_counter.clear()
+        assert client.get("/reservations/available", params=params).json() == first
+        assert not any("reservations" in s or "tables" in s for s in query_counter)
+
+    def test_available_cache_invalidated_by_table_and_hours_edits(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        params = {
+            "reservation_date": reservation_date.isoformat(),
+            "reservation_time": "18:00:00",
+            "party_size": 2,
+        }
+        assert len(client.get("/reservations/available", params=params).json()) == 1
+
+        client.post("/tables", json={"table_number": "T2", "default_chairs": 4, "max_chairs": 6})
+        assert len(client.get("/reservations/available", params=params).json()) == 2
+
+        client.patch(f"/tables/{full_setup['table']['id']}", json={"is_active": False})
+        assert len(client.get("/reservations/available", params=params).json()) == 1
+
+        client.post(
+            "/hours/special",
+            json={"date": reservation_date.isoformat(), "is_closed": True},
+        )
+        assert client.get("/reservations/available", params=params).status_code == 400
+
+
+class TestAvailabilityGrid:
+    def test_grid_covers_bookable_slots(self, client, sample_tables, operating_hours):
+        reservation_date = get_next_weekday(date.today(), 0)
+
+        response = client.get(
+            "/reservations/availability-grid",
+            params={"date": reservation_date.isoformat()},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["is_closed"] is False
+        assert data["slot_minutes"] == 15
+        times = [slot["time"] for slot in data["slots"]]
+        assert times[0] == "11:00:00"
+        assert times[-1] == "21:30:00"
+        assert len(times) == 43
+        assert all(slot["max_table_capacity"] == 4 for slot in data["slots"])
+        assert all(slot["max_combo_capacity"] == 12 for slot in data["slots"])
+
+    def test_grid_reflects_bookings(self, client, sample_tables, operating_hours):
+        reservation_date = get_next_weekday(date.today(), 0)
+        client.post(
+            "/reservations",
+            json={
+                "guest_name": "Booked",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [sample_tables[1]["id"]],
+            },
+        )
+
+        response = client.get(
+            "/reservations/availability-grid",
+            params={"date": reservation_date.isoformat()},
+        )
+
+        slots = {slot["time"]: slot for slot in response.json()["slots"]}
+        # T2 sits between T1 and T3 but all three are within join distance
+        assert slots["18:00:00"]["max_combo_capacity"] == 8
+        assert slots["16:45:00"]["max_combo_capacity"] == 8
+        assert slots["16:30:00"]["max_combo_capacity"] == 12
+        assert slots["19:30:00"]["max_combo_capacity"] == 12
+
+    def test_grid_for_closed_day(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        client.post(
+            "/hours/special",
+            json={"date": reservation_date.isoformat(), "is_closed": True},
+        )
+
+        response = client.get(
+            "/reservations/availability-grid",
+            params={"date": reservation_date.isoformat()},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["is_closed"] is True
+        assert response.json()["slots"] == []
+
+
+class TestNextAvailable:
+    def test_returns_nearest_free_slots(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        client.post(
+            "/reservations",
+            json={
+                "guest_name": "Booked",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [full_setup["table"]["id"]],
+            },
+        )
+
+        response = client.get(
+            "/reservations/next-available",
+            params={
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "limit": 2,
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [(o["reservation_date"], o["reservation_time"]) for o in data] == [
+            (reservation_date.isoformat(), "16:30:00"),
+            (reservation_date.isoformat(), "19:30:00"),
+        ]
+        assert data[0]["table_numbers"] == ["T1"]
+
+    def test_skips_closed_days(self, client, full_setup):
+        reservation_date = get_next_weekday(date.today(), 2)
+        client.post(
+            "/hours/special",
+            json={"date": reservation_date.isoformat(), "is_closed": True},
+        )
+
+        response = client.get(
+            "/reservations/next-available",
+            params={
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "horizon_days": 1,
+                "limit": 3,
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 3
+        assert reservation_date.isoformat() not in {o["reservation_date"] for o in data}
+
+    def test_query_count_does_not_grow_with_horizon(
+        self, client, db, full_setup, query_counter
+    ):
+        from rezzy.services.hours_service import HoursValidationService
+
+        reservation_date = get_next_weekday(date.today(), 0)
+        params = {
+            "party_size": 20,
+            "reservation_date": reservation_date.isoformat(),
+            "reservation_time": "18:00:00",
+        }
+
+        # Warm the hours cache so both requests are measured in steady state
+        HoursValidationService.get_hours_for_date(db, reservation_date)
+        query_counter.clear()
+
+        client.get("/reservations/next-available", params={**params, "horizon_days": 1})
+        short_horizon = len(query_counter)
+        query_counter.clear()
+        response = client.get(
+            "/reservations/next-available", params={**params, "horizon_days": 30}
+        )
+
+        assert response.json() == []
+        assert len(query_counter) == short_horizon
+
+
+    def test_unseatable_party_over_long_horizon_is_fast(
+        self, client, db, operating_hours, monkeypatch
+    ):
+        from time import perf_counter
+        from rezzy.core.config import get_settings
+        from rezzy.models import Table
+        from rezzy.services import ReservationService
+
+        monkeypatch.setattr(get_settings(), "table_join_distance", 100.0)
+        # Two clusters of fifteen two-tops, far apart: 30 seats each
+        db.add_all(
+            Table(
+                table_number=f"C{cluster}-{n}",
+                x_position=cluster * 10_000.0 + n * 50.0,
+                y_position=0.0,
+                default_chairs=2,
+                max_chairs=2,
+                current_chairs=2,
+            )
+            for cluster in range(2)
+            for n in range(15)
+        )
+        db.commit()
+
+        started = perf_counter()
+        found = ReservationService.find_next_available(
+            db, 40, get_next_weekday(date.today(), 0), time(18, 0), horizon_days=60
+        )
+        assert found == []
+        assert perf_counter() - started < 2
+
+    def test_search_stops_at_its_time_budget(self, client, db, full_setup, monkeypatch):
+        from rezzy.core.config import get_settings
+        from rezzy.services import ReservationService
+
+        monkeypatch.setattr(get_settings(), "next_available_budget_ms", 0)
+        assert ReservationService.find_next_available(
+            db, 2, get_next_weekday(date.today(), 0), time(18, 0)
+        ) == []
+
+
+class TestBestFitRanking:
+    def test_smallest_sufficient_table_is_suggested_first(
+        self, client, restaurant_config, operating_hours
+    ):
+        for number, chairs in (("Big", 8), ("Two", 2), ("Four", 4)):
+            client.post(
+                "/tables",
+                json={"table_number": number, "default_chairs": chairs, "max_chairs": chairs},
+            )
+        reservation_date = get_next_weekday(date.today(), 0)
+
+        response = client.get(
+            "/reservations/available",
+            params={
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "party_size": 2,
+            },
+        )
+
+        assert [o["table_numbers"][0] for o in response.json()] == ["Two", "Four", "Big"]
+
+
+class TestOptimizeSeating:
+    def book(self, client, reservation_date, slot, table_id):
+        return client.post(
+            "/reservations",
+            json={
+                "guest_name": f"Guest {slot}",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": slot,
+                "table_ids": [table_id],
+            },
+        ).json()
+
+    def test_dry_run_then_apply(self, client, sample_tables, operating_hours):
+        reservation_date = get_next_weekday(date.today(), 0)
+        early = self.book(client, reservation_date, "12:00:00", sample_tables[0]["id"])
+        late = self.book(client, reservation_date, "18:00:00", sample_tables[1]["id"])
+
+        response = client.post(
+            "/reservations/optimize-seating",
+            params={"date": reservation_date.isoformat()},
+        )
+        assert response.status_code == 200
+        plan = response.json()
+        assert plan["applied"] is False
+        assert len(plan["moves"]) == 1
+        assert plan["score_after"] > plan["score_before"]
+        assert client.get(f"/reservations/{late['id']}").json()["table_ids"] == [
+            sample_tables[1]["id"]
+        ]
+
+        response = client.post(
+            "/reservations/optimize-seating",
+            params={"date": reservation_date.isoformat(), "apply": True},
+        )
+        assert response.json()["applied"] is True
+        move = response.json()["moves"][0]
+        moved = client.get(f"/reservations/{move['reservation_id']}").json()
+        assert moved["table_ids"] == move["to_table_ids"]
+        assert {early["id"], late["id"]} >= {move["reservation_id"]}
+
+        again = client.post(
+            "/reservations/optimize-seating",
+            params={"date": reservation_date.isoformat()},
+        )
+        assert again.json()["moves"] == []
+
+    def test_apply_reloads_moved_reservations_in_one_query(
+        self, client, sample_tables, operating_hours, query_counter
+    ):
+        reservation_date = get_next_weekday(date.today(), 0)
+        self.book(client, reservation_date, "12:00:00", sample_tables[0]["id"])
+        self.book(client, reservation_date, "18:00:00", sample_tables[1]["id"])
+
+        query_counter.clear()
+        response = client.post(
+            "/reservations/optimize-seating",
+            params={"date": reservation_date.isoformat(), "apply": True},
+        )
+        assert response.json()["applied"] is True
+        # No per-reservation refresh after the commit
+        assert not [
+            s for s in query_counter
+            if s.lstrip().upper().startswith("SELECT") and "WHERE reservations.id = " in s
+        ]
+
+    def test_apply_rejects_plan_when_bookings_changed(
+        self, client, sample_tables, operating_hours, monkeypatch
+    ):
+        from rezzy.services import reservation_service
+
+        reservation_date = get_next_weekday(date.today(), 0)
+        self.book(client, reservation_date, "12:00:00", sample_tables[0]["id"])
+        late = self.book(client, reservation_date, "18:00:00", sample_tables[1]["id"])
+        plan = reservation_service.optimize_seating
+
+        def plan_while_someone_books(*args, **kwargs):
+            assignment = plan(*args, **kwargs)
+            self.book(client, reservation_date, "21:00:00", sample_tables[0]["id"])
+            return assignment
+
+        monkeypatch.setattr(reservation_service, "optimize_seating", plan_while_someone_books)
+        response = client.post(
+            "/reservations/optimize-seating",
+            params={"date": reservation_date.isoformat(), "apply": True},
+        )
+        assert response.status_code == 400
+        assert "changed while planning" in response.json()["detail"]
+        assert client.get(f"/reservations/{late['id']}").json()["table_ids"] == [
+            sample_tables[1]["id"]
+        ]
+
+    def test_requires_admin(self, client, db, full_setup):
+        use_non_admin_user(db)
+        response = client.post(
+            "/reservations/optimize-seating",
+            params={"date": get_next_weekday(date.today(), 0).isoformat()},
+        )
+        assert response.status_code == 403
+
+
+class TestTableLinkWindows:
+    def link_rows(self, db, reservation_id):
+        from rezzy.models import reservation_tables
+
+        return db.execute(
+            reservation_tables.select().where(
+                reservation_tables.c.reservation_id == reservation_id
+            )
+        ).all()
+
+    def test_links_carry_window_and_active_flag(self, client, db, full_setup):
+        reservation_date = get_next_weekday(date.today(), 0)
+        created = client.post(
+            "/reservations",
+            json={
+                "guest_name": "Linked",
+                "party_size": 2,
+                "reservation_date": reservation_date.isoformat(),
+                "reservation_time": "18:00:00",
+                "table_ids": [full_setup["table"]["id"]],
+            },
+        ).json()
+
+        (link,) = self.link_rows(db, created["id"])
+        assert link.starts_at == datetime.combine(reservation_date, time(18, 0))
+        assert link.ends_at == datetime.combine(reservation_date, time(19, 30))
+        assert link.is_active is True
+
+        client.patch(f"/reservations/{created['id']}", json={"reservation_time": "19:00:00"})
+        (link,) = self.link_rows(db, created["id"])
+        assert link.starts_at == datetime.combine(reservation_date, time(19, 0))
+
+        client.post(f"/reservations/{created['id']}/cancel")
+        (link,) = self.link_rows(db, created["id"])
+        assert link.is_active is False
@@ -245,6 +245,37 @@ class TestChairRearrangement:
         assert response.status_code == 400
         assert "Not enough extra chairs" in response.json()["detail"]
 
+    def test_rearrange_chairs_reports_all_missing_tables(self, client, sample_table):
+        response = client.post(
+            "/tables/rearrange-chairs",
+            json=[
+                {"table_id": 998, "new_chair_count": 4},
+                {"table_id": sample_table["id"], "new_chair_count": 6},
+                {"table_id": 999, "new_chair_count": 4},
+            ],
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Tables 998, 999 not found"
+
+    def test_rearrange_chairs_loads_tables_in_bulk(
+        self, client, sample_tables, query_counter
+    ):
+        query_counter.clear()
+        response = client.post(
+            "/tables/rearrange-chairs",
+            json=[
+                {"table_id": t["id"], "new_chair_count": 5} for t in reversed(sample_tables)
+            ],
+        )
+        assert response.status_code == 200
+        assert [t["id"] for t in response.json()] == [t["id"] for t in reversed(sample_tables)]
+        table_selects = [
+            q for q in query_counter if q.startswith("SELECT") and "FROM tables" in q
+        ]
+        # One lookup before the change, one reload after the commit
+        assert len(table_selects) == 2
+        assert all("tables.id IN" in q for q in table_selects)
+
     def test_non_admin_cannot_rearrange_chairs(self, client, db, sample_table):
         use_non_admin_user(db)
 